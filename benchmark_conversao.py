@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark da conversão para o formato Nuvemshop (converter_para_nuvemshop).
+
+Gera documentos sintéticos e um índice de imagens sintético em memória (sem arquivos),
+com uma pasta de imagens por produto, e mede a conversão com a busca de pastas original
+(todas as pastas da marca a cada produto) e com a busca indexada (preparar_busca_pastas),
+em tamanhos crescentes. Confere se as saídas são iguais (mesma ordem e conteúdo).
+
+Uso:
+    python benchmark_conversao.py
+    python benchmark_conversao.py --documentos=2500,5000,10000,20000
+"""
+
+import contextlib
+import gc
+import io
+import sys
+import time
+
+from benchmark_conexao import gerar_documentos_sinteticos
+from import_precos import converter_para_nuvemshop, normalizar_texto
+
+# Campos com data/hora da conversão, diferentes a cada execução
+CAMPOS_DATA = ("created_at", "updated_at")
+
+
+def gerar_indice_sintetico(documentos):
+    """Índice de imagens no formato de indexar_imagens, com uma pasta por produto."""
+    indice = {}
+    for i, doc in enumerate(documentos):
+        pasta = f"{doc['modelo']} {doc['cor']}"
+        imagens = sorted(
+            [f"{var['peca']}.jpg" for var in doc["variantes"]]
+            + [f"{doc['variantes'][0]['peca']} PRIMEIRA.jpg", f"KIT {doc['modelo']}.jpg"]
+        )
+        indice.setdefault(doc["marca"], []).append({
+            "path": f"/{doc['marca']}/{pasta}",
+            "path_norm": normalizar_texto(pasta),
+            "imagens": imagens,
+            "hashes": {nome: f"{i:016x}{j:016x}" for j, nome in enumerate(imagens)},
+        })
+    return indice
+
+
+def sem_datas(produtos):
+    return [{k: v for k, v in produto.items() if k not in CAMPOS_DATA} for produto in produtos]
+
+
+def converter_varrendo_pastas(documentos, indice, codigos_estoque):
+    """Conversão com a busca original: cada produto percorre todas as pastas da marca."""
+    import import_precos
+    preparar = import_precos.preparar_busca_pastas
+    import_precos.preparar_busca_pastas = lambda indice_imagens: None
+    try:
+        return converter_para_nuvemshop(documentos, indice, codigos_estoque)
+    finally:
+        import_precos.preparar_busca_pastas = preparar
+
+
+def medir(funcao, *args):
+    """Executa a conversão sem o console e com o coletor de lixo desligado (como o timeit).
+
+    Retorna (produtos sem datas, saída, segundos).
+    """
+    saida = io.StringIO()
+    gc.collect()
+    gc.disable()
+    try:
+        inicio = time.perf_counter()
+        with contextlib.redirect_stdout(saida):
+            produtos = funcao(*args)
+        segundos = time.perf_counter() - inicio
+    finally:
+        gc.enable()
+    return sem_datas(produtos), saida.getvalue(), segundos
+
+
+def main():
+    quantidades = [2500, 5000, 10000, 20000]
+    for arg in sys.argv[1:]:
+        if arg.startswith("--documentos="):
+            quantidades = [int(q) for q in arg.split("=", 1)[1].split(",")]
+
+    print("=" * 60)
+    print("Benchmark da conversão Nuvemshop: busca de pastas varrendo x indexada")
+    print("=" * 60)
+    print(f"{'documentos':>10} {'varrendo':>10} {'indexada':>10} {'speedup':>8}  saída")
+
+    for quantidade in quantidades:
+        documentos = gerar_documentos_sinteticos(quantidade)
+        indice = gerar_indice_sintetico(documentos)
+        codigos_estoque = {var["referencia"] for doc in documentos[::2] for var in doc["variantes"]}
+
+        varrendo, saida_varrendo, t_varrendo = medir(converter_varrendo_pastas, documentos, indice, codigos_estoque)
+        indexada, saida_indexada, t_indexada = medir(converter_para_nuvemshop, documentos, indice, codigos_estoque)
+        igual = varrendo == indexada and saida_varrendo == saida_indexada
+        print(f"{quantidade:>10} {t_varrendo:9.2f}s {t_indexada:9.2f}s {t_varrendo / t_indexada:7.1f}x  "
+              f"{'igual' if igual else 'DIFERENTE'}")
+
+    print("\n" + saida_indexada.strip())
+
+
+if __name__ == "__main__":
+    main()
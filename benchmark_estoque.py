@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Benchmark dos códigos de estoque: set de strings x array int64 ordenado (codigos_estoque.py).
+
+Gera um arquivo de estoque sintético (códigos '78900000 NNNN', EANs de 13 dígitos, linhas
+fora do prefixo 7890, códigos com letras e espaços nas pontas) e mede a carga do set, a
+primeira carga compacta (texto + gravação do cache), a carga pelo cache (mmap), a memória
+de cada um e o tempo das consultas. Confere se as respostas das consultas são idênticas.
+
+Uso:
+    python benchmark_estoque.py
+    python benchmark_estoque.py --codigos=5000000 --consultas=200000
+"""
+
+import gc
+import os
+import random
+import sys
+import tempfile
+import time
+
+from codigos_estoque import carregar_codigos_compactos
+from import_precos import ler_codigos_estoque_texto
+
+
+def gerar_arquivo(caminho, quantidade, semente=42):
+    """Grava o arquivo de estoque sintético e retorna amostras de códigos presentes."""
+    aleatorio = random.Random(semente)
+    amostras = []
+    with open(caminho, 'w', encoding='utf-8') as f:
+        for i in range(quantidade):
+            sorteio = aleatorio.random()
+            if sorteio < 0.5:
+                codigo = f"78900000 {i:04d}"
+            elif sorteio < 0.97:
+                codigo = f"7890{aleatorio.randrange(10 ** 9):09d}"
+            elif sorteio < 0.98:
+                codigo = f"7890-{i}X"
+            else:
+                codigo = f"1234{i:09d}"
+            if len(amostras) < 100000 and aleatorio.random() < 0.1:
+                amostras.append(codigo)
+            f.write(f"  {codigo} \n" if sorteio > 0.99 else f"{codigo}\n")
+            if sorteio < 0.001:
+                f.write("\n")
+    return amostras
+
+
+def gerar_consultas(amostras, quantidade, semente=7):
+    """Metade presentes, metade ausentes (vizinhos, prefixos, espaços, outros tipos)."""
+    aleatorio = random.Random(semente)
+    consultas = []
+    for _ in range(quantidade // 2):
+        codigo = aleatorio.choice(amostras)
+        consultas.append(codigo)
+        consultas.append(aleatorio.choice([
+            codigo[:-1], codigo + "0", f" {codigo}", codigo.replace(" ", ""),
+            f"7890{aleatorio.randrange(10 ** 9):09d}", "", None, 7890,
+        ]))
+    return consultas
+
+
+def medir(funcao, *args):
+    """Executa a chamada e retorna (resultado, segundos)."""
+    gc.collect()
+    inicio = time.perf_counter()
+    resultado = funcao(*args)
+    return resultado, time.perf_counter() - inicio
+
+
+def memoria_mb(codigos):
+    """Memória ocupada pelos códigos: set e strings, ou array + set dos códigos fora do formato."""
+    if isinstance(codigos, set):
+        textos = codigos
+        base = 0
+    else:
+        textos = codigos.extras
+        base = codigos.codigos.nbytes
+    total = base + sys.getsizeof(textos) + sum(sys.getsizeof(texto) for texto in textos)
+    return total / 1024 / 1024
+
+
+def consultar(codigos, consultas):
+    return [codigo in codigos for codigo in consultas]
+
+
+def main():
+    quantidade = 2000000
+    total_consultas = 200000
+    for arg in sys.argv[1:]:
+        if arg.startswith("--codigos="):
+            quantidade = int(arg.split("=", 1)[1])
+        elif arg.startswith("--consultas="):
+            total_consultas = int(arg.split("=", 1)[1])
+
+    pasta = tempfile.mkdtemp(prefix="bench_estoque_")
+    caminho = os.path.join(pasta, "estoque.txt")
+    cache_path = os.path.join(pasta, "cache", "codigos_estoque")
+    amostras = gerar_arquivo(caminho, quantidade)
+    consultas = gerar_consultas(amostras, total_consultas)
+
+    print("=" * 60)
+    print("Benchmark dos códigos de estoque")
+    print(f"Linhas: {quantidade} ({os.path.getsize(caminho) / 1024 / 1024:.1f} MB)  "
+          f"Consultas: {len(consultas)}")
+    print("=" * 60)
+
+    texto, t_texto = medir(ler_codigos_estoque_texto, caminho)
+    compacto, t_compacto = medir(carregar_codigos_compactos, caminho, cache_path)
+    cache, t_cache = medir(carregar_codigos_compactos, caminho, cache_path)
+
+    print(f"\n{'':<26} {'carga':>8} {'memória':>10}")
+    print(f"{'set de strings':<26} {t_texto:7.2f}s {memoria_mb(texto):8.1f} MB")
+    print(f"{'int64 (texto + cache)':<26} {t_compacto:7.2f}s {memoria_mb(compacto):8.1f} MB")
+    print(f"{'int64 (cache mmap)':<26} {t_cache:7.3f}s {memoria_mb(cache):8.1f} MB (mmap)"
+          f"  {t_texto / t_cache:.0f}x mais rápido que o set")
+    print(f"Códigos: {len(texto)} (set) / {len(compacto)} (int64, {len(compacto.extras)} fora do formato)")
+
+    respostas = {}
+    for nome, codigos in (("set", texto), ("int64", compacto), ("int64 mmap", cache)):
+        inicio = time.perf_counter()
+        respostas[nome] = consultar(codigos, consultas)
+        segundos = time.perf_counter() - inicio
+        print(f"Consultas {nome:<11} {segundos:6.2f}s ({len(consultas) / segundos:9.0f}/s)")
+
+    iguais = respostas["set"] == respostas["int64"] == respostas["int64 mmap"]
+    print(f"\nRespostas {'iguais' if iguais else 'DIFERENTES'} "
+          f"({sum(respostas['set'])} presentes de {len(consultas)})")
+    print(f"Conjuntos {'iguais' if set(compacto) == texto else 'DIFERENTES'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Benchmark da leitura da tabela de preços: xlsx x CSV x Parquet, com os mesmos dados.
+
+Gera abas sintéticas (SUZUKI e OUTRAS, ver benchmark_segmentacao.py), grava a planilha
+xlsx, um CSV por marca e um Parquet com a coluna MARCA, mede processar_planilha em cada
+formato e confere se os documentos gerados são idênticos (a menos da ordem). Um segundo
+Parquet guarda o preço como decimal128, que o pyarrow entrega como Decimal.
+
+O CSV é gravado como o ERP exporta: tudo texto, preços no formato brasileiro ('1.234,50',
+'25,00', '1.234'), sem nenhuma conversão prévia; a leitura tem que chegar aos mesmos preços
+das células numéricas da planilha.
+
+Uso:
+    python benchmark_formatos.py
+    python benchmark_formatos.py --linhas=100000 --pasta=/tmp/bench_formatos
+"""
+
+import contextlib
+import csv
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+from decimal import Decimal
+
+from benchmark_segmentacao import gerar_linhas, sem_datas
+from import_precos import processar_planilha
+
+MARCAS = ("SUZUKI", "OUTRAS")
+CABECALHO = ["MODELO", "COR", "KIT/CONJUNTO", "ELEMENTO", "PREÇO", "LOC", "REFERÊNCIA"]
+
+
+def dados_erp(linhas, semente=0):
+    """Células como o ERP exporta a planilha: preço numérico (com alguns acima de mil) e sem ''."""
+    aleatorio = random.Random(semente)
+    resultado = []
+    for linha in linhas:
+        linha = [None if valor == "" else valor for valor in linha]
+        if isinstance(linha[4], str):
+            linha[4] = 12.5  # "12,50" em texto no gerador: no ERP o preço é sempre número
+        if linha[4] and aleatorio.random() < 0.1:
+            linha[4] = aleatorio.choice([1234, 1234.5, 12345.67])
+        resultado.append(linha)
+    return resultado
+
+
+def texto_csv(valor):
+    """Célula como texto do CSV do ERP: números no formato brasileiro ('1.234,50', '1.234')."""
+    if valor is None:
+        return ""
+    if isinstance(valor, float):
+        return f"{valor:,.2f}".translate(str.maketrans(",.", ".,"))
+    if isinstance(valor, int):
+        return f"{valor:,}".replace(",", ".")
+    return valor
+
+
+def texto_ou_none(valor):
+    return None if valor is None else str(valor)
+
+
+def gravar_xlsx(caminho, abas):
+    from openpyxl import Workbook
+    wb = Workbook(write_only=True)
+    for marca, linhas in abas.items():
+        ws = wb.create_sheet(marca)
+        ws.append(CABECALHO)
+        for linha in linhas:
+            ws.append(linha)
+    wb.save(caminho)
+
+
+def gravar_csv(pasta, abas):
+    os.makedirs(pasta, exist_ok=True)
+    for marca, linhas in abas.items():
+        with open(os.path.join(pasta, f"{marca}.csv"), 'w', encoding='utf-8', newline='') as f:
+            escritor = csv.writer(f, delimiter=';')
+            escritor.writerow(CABECALHO)
+            # Só a coluna de preço sai no formato numérico; as outras são texto ('7', '7890000012345')
+            escritor.writerows([
+                [texto_csv(v) if i == 4 else texto_ou_none(v) or "" for i, v in enumerate(linha)]
+                for linha in linhas
+            ])
+
+
+def gravar_parquet(caminho, abas, decimal=False):
+    """Parquet com a coluna MARCA; preço em float64 ou, com decimal=True, em decimal128(14, 2)."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    tipo_preco = pa.decimal128(14, 2) if decimal else pa.float64()
+    marcas, colunas = [], [[] for _ in CABECALHO]
+    for marca, linhas in abas.items():
+        for linha in linhas:
+            marcas.append(marca)
+            for i, valor in enumerate(linha):
+                if i == 4:
+                    if decimal and isinstance(valor, (int, float)):
+                        valor = Decimal(str(valor)).quantize(Decimal("0.01"))
+                    colunas[i].append(valor)
+                else:
+                    colunas[i].append(texto_ou_none(valor))
+    tabela = pa.table(
+        [pa.array(marcas, pa.string())]
+        + [pa.array(valores, tipo_preco if i == 4 else pa.string()) for i, valores in enumerate(colunas)],
+        names=["MARCA"] + CABECALHO,
+    )
+    pq.write_table(tabela, caminho)
+
+
+def gravar_parquet_decimal(caminho, abas):
+    gravar_parquet(caminho, abas, decimal=True)
+
+
+def ordenar(documentos):
+    """Documentos em ordem de (marca, modelo, cor): a pasta de CSV é lida em ordem alfabética."""
+    return sorted(sem_datas(documentos), key=lambda d: (d["marca"], d["modelo"] or "", d["cor"] or ""))
+
+
+def tamanho(caminho):
+    if os.path.isdir(caminho):
+        return sum(os.path.getsize(os.path.join(caminho, nome)) for nome in os.listdir(caminho))
+    return os.path.getsize(caminho)
+
+
+def main():
+    quantidade = 100000
+    pasta = None
+    for arg in sys.argv[1:]:
+        if arg.startswith("--linhas="):
+            quantidade = int(arg.split("=", 1)[1])
+        elif arg.startswith("--pasta="):
+            pasta = arg.split("=", 1)[1]
+    pasta = pasta or tempfile.mkdtemp(prefix="bench_formatos_")
+    os.makedirs(pasta, exist_ok=True)
+
+    abas = {
+        marca: dados_erp(gerar_linhas(quantidade, outras=(marca == "OUTRAS"), semente=i), semente=i)
+        for i, marca in enumerate(MARCAS)
+    }
+    total_linhas = sum(len(linhas) for linhas in abas.values())
+
+    formatos = [
+        ("xlsx", os.path.join(pasta, "tabela.xlsx"), gravar_xlsx),
+        ("csv (arquivo por marca)", os.path.join(pasta, "csv"), gravar_csv),
+        ("parquet (coluna MARCA)", os.path.join(pasta, "tabela.parquet"), gravar_parquet),
+        ("parquet (preço decimal)", os.path.join(pasta, "tabela_decimal.parquet"), gravar_parquet_decimal),
+    ]
+
+    print("=" * 60)
+    print("Benchmark de leitura da tabela: xlsx x CSV x Parquet")
+    print(f"Linhas: {total_linhas} ({', '.join(MARCAS)})  Pasta: {pasta}")
+    print("=" * 60)
+
+    referencia = None
+    tempo_xlsx = None
+    for nome, caminho, gravar in formatos:
+        if not os.path.exists(caminho):
+            gravar(caminho, abas)
+
+        inicio = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            documentos = processar_planilha(caminho)
+        segundos = time.perf_counter() - inicio
+
+        documentos = ordenar(documentos)
+        if referencia is None:
+            referencia, tempo_xlsx = documentos, segundos
+        igual = documentos == referencia
+        print(f"{nome:<26} {segundos:7.2f}s  {total_linhas / segundos:9.0f} linhas/s  "
+              f"{tamanho(caminho) / 1024 / 1024:7.1f} MB  {tempo_xlsx / segundos:5.1f}x  "
+              f"{len(documentos)} documentos ({'iguais' if igual else 'DIFERENTES'})")
+
+
+if __name__ == "__main__":
+    main()
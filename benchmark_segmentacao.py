@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark da segmentação das abas: linha a linha (processar_linhas_aba) x vetorizada
+(segmentacao_numpy), sobre abas sintéticas em memória.
+
+As abas sintéticas imitam a planilha: blocos de modelo/cores/peças separados por linhas
+vazias com preço 0, linhas de marca na aba OUTRAS e casos de borda (células só com espaços,
+preço em texto, modelos com "GAV" ou números). Confere se as duas saídas são idênticas.
+
+Uso:
+    python benchmark_segmentacao.py
+    python benchmark_segmentacao.py --linhas=1000000
+"""
+
+import gc
+import random
+import sys
+import time
+
+from import_precos import eh_linha_marca, eh_linha_separadora, processar_linhas_aba
+from segmentacao_numpy import carregar_colunas, processar_linhas_aba_numpy, segmentar_colunas
+
+MARCAS_OUTRAS = ["AGRALE", "APRILIA", "BMW", "HARLEY DAVIDSON", "KASINSKI"]
+CORES = ["PRETA", "VERMELHA", "AZUL", "BRANCA", " ", "PRATA/AZUL"]
+PECAS = ["TANQUE ESQ", "TANQUE DIR", "RABETA", "FRONTAL", "KIT COMPLETO", "  "]
+
+
+def gerar_linhas(quantidade, outras=False, semente=42):
+    """Gera as linhas (colunas A-G) de uma aba sintética."""
+    aleatorio = random.Random(semente)
+    linhas = []
+    bloco = 0
+    while len(linhas) < quantidade:
+        if outras and aleatorio.random() < 0.05:
+            linhas.append((aleatorio.choice(MARCAS_OUTRAS), None, None, None, None, None, None))
+        if aleatorio.random() < 0.02:
+            # Parece marca mas não é (número / GAV)
+            linhas.append((aleatorio.choice(["GAV 12", "CG 150"]), None, None, None, 0, None, None))
+        bloco += 1
+        ano = aleatorio.choice(["08", "2012", "98", ""])
+        for j in range(aleatorio.randint(1, 8)):
+            linhas.append((
+                f"MODELO {bloco} {ano}".strip() if j == 0 else aleatorio.choice([None, "", " "]),
+                aleatorio.choice(CORES) if j < 3 else None,
+                aleatorio.choice(PECAS + [None]),
+                aleatorio.choice([None, "A", "B 2"]),
+                aleatorio.choice([25.0, 10, 0, None, "", "12,50"]),
+                aleatorio.choice([None, "3", 7]),
+                aleatorio.choice([None, f"78900000 {bloco:04d}", 7890000012345]),
+            ))
+        linhas.append((None, None, None, None, aleatorio.choice([0, None, 0.0]), None, " "))
+    return linhas[:quantidade]
+
+
+def sem_datas(documentos):
+    return [{k: v for k, v in doc.items() if k != "data_importacao"} for doc in documentos]
+
+
+def classificar_linhas(marca_aba, linhas):
+    """Só a classificação linha a linha (marca/separadora), para comparar com segmentar_colunas."""
+    eh_aba_outras = (marca_aba == "OUTRAS")
+    return [
+        "marca" if eh_aba_outras and eh_linha_marca(row) else
+        "separadora" if eh_linha_separadora(row) else "dados"
+        for row in linhas
+    ]
+
+
+def medir(funcao, *args):
+    """Executa e mede uma chamada com o coletor de lixo desligado (como o timeit)."""
+    gc.collect()
+    gc.disable()
+    try:
+        inicio = time.perf_counter()
+        resultado = funcao(*args)
+        return resultado, time.perf_counter() - inicio
+    finally:
+        gc.enable()
+
+
+def main():
+    quantidade = 1000000
+    for arg in sys.argv[1:]:
+        if arg.startswith("--linhas="):
+            quantidade = int(arg.split("=", 1)[1])
+
+    print("=" * 60)
+    print("Benchmark da segmentação das abas")
+    print("=" * 60)
+
+    for marca_aba in ("SUZUKI", "OUTRAS"):
+        linhas = gerar_linhas(quantidade, outras=(marca_aba == "OUTRAS"))
+
+        por_linha, tempo_linhas = medir(processar_linhas_aba, marca_aba, linhas)
+        vetorizado, tempo_numpy = medir(processar_linhas_aba_numpy, marca_aba, linhas)
+        _, tempo_classificacao = medir(classificar_linhas, marca_aba, linhas)
+        colunas, tempo_carga = medir(carregar_colunas, linhas)
+        _, tempo_segmentacao = medir(segmentar_colunas, marca_aba, colunas)
+
+        igual = sem_datas(por_linha) == sem_datas(vetorizado)
+        print(f"\nAba {marca_aba}: {len(linhas)} linhas, {len(por_linha)} documentos")
+        print("  Aba completa (documentos):")
+        print(f"    linha a linha: {tempo_linhas:6.2f}s ({len(linhas) / tempo_linhas:10.0f} linhas/s)")
+        print(f"    numpy:         {tempo_numpy:6.2f}s ({len(linhas) / tempo_numpy:10.0f} linhas/s)"
+              f"  speedup {tempo_linhas / tempo_numpy:4.2f}x")
+        print("  Só a segmentação (separadoras, marcas e blocos):")
+        print(f"    linha a linha: {tempo_classificacao:6.2f}s")
+        print(f"    numpy:         {tempo_segmentacao:6.2f}s  speedup {tempo_classificacao / tempo_segmentacao:4.2f}x"
+              f"  (+ {tempo_carga:.2f}s para carregar as linhas em colunas)")
+        print(f"  saída {'igual' if igual else 'DIFERENTE'}")
+
+
+if __name__ == "__main__":
+    main()
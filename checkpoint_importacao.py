@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Checkpoint das importações, para retomar uma execução interrompida (--resume).
+
+Cada execução recebe um run id e um diretório em CHECKPOINT_PATH com:
+    checkpoint.json  - hash da planilha, modo, etapas concluídas, lotes de escrita confirmados
+                       e resumos da escrita de cada coleção
+    estatisticas.json - resumo da execução (ver estatisticas_importacao.py)
+    *.pickle         - saída das etapas (documentos da planilha, produtos convertidos)
+
+O registro é local (e não no MongoDB) para continuar disponível quando a falha é justamente
+a conexão com o Atlas. Ao final de uma execução completa os dados das etapas são removidos
+e ficam só o checkpoint.json e o estatisticas.json como registro. Só os diretórios das
+últimas execuções são mantidos (ver limpar_antigos).
+
+Uso:
+    python import_precos.py --resume            - retoma a última importação interrompida
+    python import_precos.py --resume=<run_id>   - retoma uma execução específica
+"""
+
+import json
+import os
+import pickle
+import shutil
+import time
+import uuid
+from datetime import datetime
+
+ARQUIVO_CHECKPOINT = "checkpoint.json"
+
+
+def hash_arquivo(caminho):
+    """Hash de conteúdo do arquivo (blake2b de 128 bits, 32 hex).
+
+    Para uma pasta (tabela em CSV/Parquet), combina nome e conteúdo de cada arquivo.
+    """
+    import hashlib
+    h = hashlib.blake2b(digest_size=16)
+    if os.path.isdir(caminho):
+        for nome in sorted(os.listdir(caminho)):
+            if os.path.isfile(os.path.join(caminho, nome)):
+                h.update(nome.encode())
+                h.update(hash_arquivo(os.path.join(caminho, nome)).encode())
+        return h.hexdigest()
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(1024 * 1024), b''):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def _gravar_atomico(caminho, escrever, binario=False):
+    """Grava o arquivo de forma atômica (arquivo temporário + rename)."""
+    temporario = f"{caminho}.tmp"
+    with open(temporario, 'wb' if binario else 'w', **({} if binario else {'encoding': 'utf-8'})) as f:
+        escrever(f)
+    os.replace(temporario, caminho)
+
+
+class CheckpointImportacao:
+    """Estado de uma execução do importador, gravado a cada etapa e a cada lote confirmado."""
+
+    def __init__(self, diretorio, dados):
+        self.diretorio = diretorio
+        self.dados = dados
+
+    @property
+    def run_id(self):
+        return self.dados["run_id"]
+
+    @classmethod
+    def criar(cls, diretorio_base, planilha, hash_planilha, opcoes):
+        """Cria o checkpoint de uma nova execução."""
+        agora = datetime.now()
+        run_id = f"{agora.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        checkpoint = cls(os.path.join(diretorio_base, run_id), {
+            "run_id": run_id,
+            "iniciado_em": agora.isoformat(timespec="seconds"),
+            "criado_ns": time.time_ns(),
+            "atualizado_em": agora.isoformat(timespec="seconds"),
+            "planilha": {"caminho": planilha, "hash": hash_planilha},
+            "opcoes": opcoes,
+            "etapas_concluidas": [],
+            "lotes_confirmados": {},
+            "concluido": False,
+        })
+        os.makedirs(checkpoint.diretorio, exist_ok=True)
+        checkpoint.salvar()
+        return checkpoint
+
+    @classmethod
+    def carregar(cls, diretorio):
+        """Carrega o checkpoint de um diretório de execução, ou None se não existir/for inválido."""
+        caminho = os.path.join(diretorio, ARQUIVO_CHECKPOINT)
+        try:
+            with open(caminho, 'r', encoding='utf-8') as f:
+                return cls(diretorio, json.load(f))
+        except (OSError, ValueError):
+            return None
+
+    @classmethod
+    def ultimo_pendente(cls, diretorio_base, run_id=None):
+        """Checkpoint da execução interrompida mais recente (ou do run_id informado).
+
+        Só conta uma execução interrompida depois da última concluída: as anteriores foram
+        superadas (retomá-las gravaria dados mais antigos por cima da importação concluída).
+        """
+        if run_id:
+            checkpoint = cls.carregar(os.path.join(diretorio_base, run_id))
+            return checkpoint if checkpoint and not checkpoint.dados["concluido"] else None
+        execucoes = cls._execucoes(diretorio_base)
+        return execucoes[0] if execucoes and not execucoes[0].dados["concluido"] else None
+
+    @classmethod
+    def _execucoes(cls, diretorio_base):
+        """Checkpoints válidos em diretorio_base, do mais recente para o mais antigo."""
+        if not os.path.isdir(diretorio_base):
+            return []
+        checkpoints = [cls.carregar(os.path.join(diretorio_base, nome)) for nome in os.listdir(diretorio_base)]
+        # run id começa com data/hora (resolução de segundos); criado_ns desempata no mesmo segundo
+        return sorted(
+            (c for c in checkpoints if c),
+            key=lambda c: (c.run_id[:15], c.dados.get("criado_ns", 0)),
+            reverse=True,
+        )
+
+    @classmethod
+    def limpar_antigos(cls, diretorio_base, manter):
+        """Remove os diretórios das execuções mais antigas, mantendo as `manter` mais recentes.
+
+        manter=0 não remove nada. Retorna a quantidade de diretórios removidos.
+        """
+        if manter <= 0:
+            return 0
+        removidos = 0
+        for checkpoint in cls._execucoes(diretorio_base)[manter:]:
+            shutil.rmtree(checkpoint.diretorio, ignore_errors=True)
+            removidos += 1
+        return removidos
+
+    def salvar(self):
+        self.dados["atualizado_em"] = datetime.now().isoformat(timespec="seconds")
+        _gravar_atomico(
+            os.path.join(self.diretorio, ARQUIVO_CHECKPOINT),
+            lambda f: json.dump(self.dados, f, ensure_ascii=False, indent=2),
+        )
+
+    # Etapas
+
+    def etapa_concluida(self, etapa):
+        return etapa in self.dados["etapas_concluidas"]
+
+    def concluir_etapa(self, etapa, resumo=None):
+        """Registra a etapa como concluída, com o resumo da escrita (para as estatísticas da retomada)."""
+        if etapa not in self.dados["etapas_concluidas"]:
+            self.dados["etapas_concluidas"].append(etapa)
+            if resumo is not None:
+                self.dados.setdefault("resumos", {})[etapa] = resumo
+            self.salvar()
+
+    def resumo_etapa(self, etapa):
+        return self.dados.get("resumos", {}).get(etapa)
+
+    def salvar_dados(self, nome, valor):
+        """Grava a saída de uma etapa (pickle), para não refazê-la na retomada."""
+        _gravar_atomico(
+            os.path.join(self.diretorio, f"{nome}.pickle"),
+            lambda f: pickle.dump(valor, f, protocol=pickle.HIGHEST_PROTOCOL),
+            binario=True,
+        )
+
+    def carregar_dados(self, nome):
+        with open(os.path.join(self.diretorio, f"{nome}.pickle"), 'rb') as f:
+            return pickle.load(f)
+
+    # Lotes de escrita
+
+    def lote_confirmado(self, etapa, indice):
+        return indice in self.dados["lotes_confirmados"].get(etapa, [])
+
+    def confirmar_lote(self, etapa, indice):
+        """Registra um lote de escrita confirmado (acknowledged) pelo servidor."""
+        self.dados["lotes_confirmados"].setdefault(etapa, []).append(indice)
+        self.salvar()
+
+    def finalizar(self):
+        """Marca a execução como concluída e remove os dados intermediários."""
+        for nome in os.listdir(self.diretorio):
+            if nome.endswith(".pickle"):
+                os.remove(os.path.join(self.diretorio, nome))
+        self.dados["concluido"] = True
+        self.salvar()
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Códigos do arquivo de estoque em um array ordenado de int64, com cache binário mapeado em memória.
+
+Cada código ('78900000 2151', '7890000012345') vira um inteiro: os caracteres 0-9 e espaço são
+os dígitos 1-11 de um número em base 12. Sem o dígito 0 não há zeros à esquerda, então
+a conversão é injetora e a pertinência é exatamente a mesma do set de strings. Códigos com
+outros caracteres ou com mais de 17 caracteres (não cabem em int64) ficam em um set à parte.
+
+O array é gravado em CODIGOS_ESTOQUE_CACHE_PATH (.npy + .json com o tamanho e o mtime do
+arquivo de estoque). Enquanto o arquivo não muda, o array é aberto com mmap, sem reler o texto.
+"""
+
+import json
+import os
+import re
+from itertools import islice
+
+import numpy as np
+
+VERSAO_CACHE = 1
+PREFIXO = '7890'
+MAX_CARACTERES = 17                  # 12**17 < 2**63
+_CODIGO_COMPACTO = re.compile(r"[0-9 ]{1,%d}" % MAX_CARACTERES)
+_PARA_BASE12 = str.maketrans("0123456789 ", "123456789ab")
+_DE_BASE12 = str.maketrans("123456789AB", "0123456789 ")
+# Dígito de cada caractere (código ASCII): 0-9 -> 1-10, espaço -> 11, '\0' (preenchimento) -> 0
+_TABELA_DIGITOS = np.full(129, -1, dtype=np.int8)
+_TABELA_DIGITOS[0] = 0
+_TABELA_DIGITOS[ord('0'):ord('9') + 1] = np.arange(1, 11)
+_TABELA_DIGITOS[ord(' ')] = 11
+_POTENCIAS_12 = 12 ** np.arange(MAX_CARACTERES + 1, dtype=np.int64)
+_PESOS = _POTENCIAS_12[MAX_CARACTERES - 1::-1]   # peso de cada posição: 12**16 ... 12**0
+CODIGOS_POR_LOTE = 262144
+
+
+def codificar(codigo):
+    """Código em texto para int, ou None se não couber na representação compacta."""
+    if not _CODIGO_COMPACTO.fullmatch(codigo):
+        return None
+    return int(codigo.translate(_PARA_BASE12), 12)
+
+
+def codificar_lote(codigos):
+    """codificar para uma lista de códigos, vetorizado. Retorna (array int64, códigos fora do formato).
+
+    Cada código vira uma linha de 17 caracteres (UCS-4); os caracteres são trocados pelos
+    dígitos da base 12 por uma tabela e o número sai do produto pelos pesos das posições.
+    O preenchimento à direita (dígito 0) é removido dividindo por 12**(caracteres faltantes).
+    """
+    if not codigos:
+        return np.empty(0, dtype=np.int64), []
+
+    tamanhos = np.fromiter(map(len, codigos), dtype=np.int64, count=len(codigos))
+    # Códigos com mais de 17 caracteres são truncados aqui e descartados pela máscara abaixo
+    caracteres = np.array(codigos, dtype=f"<U{MAX_CARACTERES}").view(np.uint32).reshape(len(codigos), -1)
+    digitos = _TABELA_DIGITOS[np.minimum(caracteres, len(_TABELA_DIGITOS) - 1)]
+    # Válido: só 0-9/espaço dentro do tamanho do código (um '\0' no código seria perdido pelo numpy)
+    dentro = np.arange(MAX_CARACTERES) < tamanhos[:, None]
+    validos = ((digitos > 0) == dentro).all(axis=1) & (tamanhos > 0) & (tamanhos <= MAX_CARACTERES)
+
+    valores = np.maximum(digitos, 0).astype(np.int64) @ _PESOS
+    valores //= _POTENCIAS_12[np.clip(MAX_CARACTERES - tamanhos, 0, MAX_CARACTERES)]
+
+    extras = [codigos[i] for i in np.flatnonzero(~validos).tolist()]
+    return valores[validos], extras
+
+
+def decodificar(valor):
+    """Inverso de codificar."""
+    return np.base_repr(int(valor), 12).translate(_DE_BASE12)
+
+
+def ler_codigos(caminho):
+    """Gera as linhas do arquivo de estoque que são códigos (sem espaços nas pontas, prefixo 7890).
+
+    O arquivo é lido linha a linha, sem carregar o texto inteiro.
+    """
+    with open(caminho, 'r', encoding='utf-8') as f:
+        for linha in map(str.strip, f):
+            if linha.startswith(PREFIXO):
+                yield linha
+
+
+class CodigosEstoque:
+    """Conjunto de códigos de estoque: array int64 ordenado + set dos códigos fora do formato.
+
+    Suporta `in`, len, iteração e ^ (diferença simétrica, usada pelo modo watch) como o set.
+    """
+
+    def __init__(self, codigos=None, extras=None):
+        self.codigos = np.empty(0, dtype=np.int64) if codigos is None else codigos
+        self.extras = set(extras or ())
+
+    @classmethod
+    def de_textos(cls, textos):
+        """Monta o conjunto a partir de códigos em texto (qualquer iterável, codificado em lotes).
+
+        Só um lote de CODIGOS_POR_LOTE textos fica em memória por vez, além dos arrays int64.
+        """
+        textos = iter(textos)
+        partes, extras = [], []
+        for lote in iter(lambda: list(islice(textos, CODIGOS_POR_LOTE)), []):
+            valores, fora = codificar_lote(lote)
+            partes.append(valores)
+            extras += fora
+        codigos = np.sort(np.concatenate(partes)) if partes else np.empty(0, dtype=np.int64)
+        # Remove repetidos (np.unique faz o mesmo, mas por hash e mais devagar no numpy 2)
+        if len(codigos):
+            codigos = codigos[np.concatenate(([True], codigos[1:] != codigos[:-1]))]
+        return cls(codigos, extras)
+
+    def __contains__(self, codigo):
+        if not isinstance(codigo, str):
+            return False
+        valor = codificar(codigo)
+        if valor is None:
+            return codigo in self.extras
+        i = self.codigos.searchsorted(valor)
+        return i < len(self.codigos) and self.codigos[i] == valor
+
+    def __len__(self):
+        return len(self.codigos) + len(self.extras)
+
+    def __iter__(self):
+        for valor in self.codigos.tolist():
+            yield decodificar(valor)
+        yield from self.extras
+
+    def __xor__(self, outro):
+        if not isinstance(outro, CodigosEstoque):
+            outro = CodigosEstoque.de_textos(outro)
+        return CodigosEstoque(
+            np.setxor1d(self.codigos, outro.codigos, assume_unique=True), self.extras ^ outro.extras
+        )
+
+    __rxor__ = __xor__
+
+    def __eq__(self, outro):
+        if not isinstance(outro, CodigosEstoque):
+            return NotImplemented
+        return self.extras == outro.extras and np.array_equal(self.codigos, outro.codigos)
+
+    def __repr__(self):
+        return f"CodigosEstoque({len(self)} códigos)"
+
+
+def chave_origem(caminho):
+    """Identifica a versão do arquivo de estoque: caminho, tamanho e mtime."""
+    info = os.stat(caminho)
+    return {
+        "versao": VERSAO_CACHE,
+        "origem": os.path.abspath(caminho),
+        "tamanho": info.st_size,
+        "mtime_ns": info.st_mtime_ns,
+    }
+
+
+def carregar_cache(cache_path, chave):
+    """Abre o array do cache (mmap) se foi gerado do mesmo arquivo de estoque, senão None."""
+    try:
+        with open(f"{cache_path}.json", 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if {k: meta.get(k) for k in chave} != chave:
+            return None
+        codigos = np.load(f"{cache_path}.npy", mmap_mode='r')
+    except (OSError, ValueError):
+        return None
+    if codigos.dtype != np.int64 or len(codigos) != meta.get("quantidade"):
+        return None
+    return CodigosEstoque(codigos.view(np.ndarray), meta.get("extras"))
+
+
+def salvar_cache(cache_path, chave, conjunto):
+    """Grava o array (.npy) e depois os metadados (.json), ambos de forma atômica."""
+    os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+    temporario = f"{cache_path}.npy.tmp"
+    with open(temporario, 'wb') as f:
+        np.save(f, conjunto.codigos)
+    os.replace(temporario, f"{cache_path}.npy")
+
+    temporario = f"{cache_path}.json.tmp"
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump({**chave, "quantidade": len(conjunto.codigos), "extras": sorted(conjunto.extras)}, f)
+    os.replace(temporario, f"{cache_path}.json")
+
+
+def carregar_codigos_compactos(caminho, cache_path=None):
+    """Carrega os códigos do arquivo de estoque, usando o cache quando o arquivo não mudou."""
+    if not caminho:
+        return CodigosEstoque()
+    try:
+        chave = chave_origem(caminho)
+    except FileNotFoundError:
+        print(f"AVISO: Arquivo de códigos de estoque não encontrado: {caminho}")
+        return CodigosEstoque()
+
+    if cache_path:
+        conjunto = carregar_cache(cache_path, chave)
+        if conjunto is not None:
+            return conjunto
+
+    conjunto = CodigosEstoque.de_textos(ler_codigos(caminho))
+    if cache_path:
+        try:
+            salvar_cache(cache_path, chave, conjunto)
+        except OSError as e:
+            print(f"AVISO: Não foi possível gravar o cache de códigos de estoque: {e}")
+    return conjunto
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Consulta de leitura do catálogo (produtos_nuvemshop e precos) com cache em processo.
+
+Buscas por handle, por marca + modelo (+ ano) e por SKU, apoiadas pelos índices criados
+em criar_indices. Os resultados ficam em um cache LRU com TTL, invalidado quando muda a
+geração da última importação (maior data_importacao em precos / updated_at em
+produtos_nuvemshop).
+
+Uso:
+    python consulta_catalogo.py --servidor --porta=8098   - endpoint HTTP (JSON) em 127.0.0.1
+    python consulta_catalogo.py --servidor --host=0.0.0.0 - aceita conexões de outras máquinas
+    python consulta_catalogo.py --benchmark               - latência p50/p99 com e sem cache
+
+Endpoints:
+    GET /produtos/{handle}
+    GET /produtos?marca=SUZUKI&modelo=HAYABUSA 08[&ano=2008]
+    GET /produtos/sku/{sku}
+    GET /busca?q=HAYABUSA 2008 PRETA TANQUE
+    GET /precos?marca=SUZUKI&modelo=HAYABUSA 2008[&ano=2008]
+    GET /precos/sku/{sku}
+    GET /cache
+"""
+
+import json
+import random
+import sys
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+from import_precos import (
+    COLLECTION_NAME,
+    COLLECTION_NUVEMSHOP,
+    DATABASE_NAME,
+    conectar_mongodb,
+    processar_ano_modelo,
+    tokens_consulta,
+)
+
+TAMANHO_CACHE = 10000
+TTL_CACHE = 300.0           # segundos de validade de cada entrada
+INTERVALO_GERACAO = 5.0     # segundos entre verificações da geração da importação
+
+
+class CacheLRU:
+    """Cache LRU com TTL por entrada, seguro para threads."""
+
+    def __init__(self, tamanho=TAMANHO_CACHE, ttl=TTL_CACHE):
+        self.tamanho = tamanho
+        self.ttl = ttl
+        self._dados = OrderedDict()
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+
+    def obter(self, chave):
+        """Retorna (encontrado, valor)."""
+        with self._lock:
+            entrada = self._dados.get(chave)
+            if entrada is None or entrada[0] < time.monotonic():
+                if entrada is not None:
+                    del self._dados[chave]
+                self.falhas += 1
+                return False, None
+            self._dados.move_to_end(chave)
+            self.acertos += 1
+            return True, entrada[1]
+
+    def guardar(self, chave, valor):
+        with self._lock:
+            self._dados[chave] = (time.monotonic() + self.ttl, valor)
+            self._dados.move_to_end(chave)
+            while len(self._dados) > self.tamanho:
+                self._dados.popitem(last=False)
+
+    def limpar(self):
+        with self._lock:
+            self._dados.clear()
+
+    def __len__(self):
+        return len(self._dados)
+
+
+class ConsultaCatalogo:
+    """API de leitura do catálogo. Os documentos retornados são compartilhados com o cache:
+    não devem ser alterados pelo chamador."""
+
+    def __init__(self, db, tamanho_cache=TAMANHO_CACHE, ttl=TTL_CACHE, intervalo_geracao=INTERVALO_GERACAO):
+        self.precos = db[COLLECTION_NAME]
+        self.produtos = db[COLLECTION_NUVEMSHOP]
+        self.cache = CacheLRU(tamanho_cache, ttl)
+        self.intervalo_geracao = intervalo_geracao
+        self.geracao = None
+        self._proxima_verificacao = 0.0
+        self._lock_geracao = threading.Lock()
+
+    def geracao_atual(self):
+        """Geração da última importação: (maior data_importacao, maior updated_at)."""
+        ultimo_preco = self.precos.find_one({}, {"data_importacao": 1}, sort=[("data_importacao", -1)])
+        ultimo_produto = self.produtos.find_one({}, {"updated_at": 1}, sort=[("updated_at", -1)])
+        return (
+            ultimo_preco.get("data_importacao") if ultimo_preco else None,
+            ultimo_produto.get("updated_at") if ultimo_produto else None,
+        )
+
+    def _verificar_geracao(self):
+        """Limpa o cache se uma nova importação foi gravada (no máximo a cada intervalo)."""
+        agora = time.monotonic()
+        if agora < self._proxima_verificacao:
+            return
+        with self._lock_geracao:
+            if agora < self._proxima_verificacao:
+                return
+            geracao = self.geracao_atual()
+            if geracao != self.geracao:
+                self.cache.limpar()
+                self.geracao = geracao
+            self._proxima_verificacao = agora + self.intervalo_geracao
+
+    def _consultar(self, chave, funcao):
+        self._verificar_geracao()
+        encontrado, valor = self.cache.obter(chave)
+        if encontrado:
+            return valor
+        valor = funcao()
+        self.cache.guardar(chave, valor)
+        return valor
+
+    @staticmethod
+    def _filtro_modelo(marca, modelo, ano=None):
+        # Aceita o modelo com ano de 2 ou 4 dígitos (armazenado com 4)
+        modelo_formatado, _, _ = processar_ano_modelo(modelo)
+        filtro = {"marca": marca.strip().upper(), "modelo": modelo_formatado}
+        if ano is not None:
+            filtro["ano"] = int(ano)
+        return filtro
+
+    def produto_por_handle(self, handle):
+        """Produto Nuvemshop pelo handle, ou None."""
+        return self._consultar(("produto_handle", handle), lambda: self.produtos.find_one({"handle": handle}))
+
+    def produtos_por_modelo(self, marca, modelo, ano=None):
+        """Produtos Nuvemshop de uma marca + modelo (+ ano), todas as cores."""
+        filtro = self._filtro_modelo(marca, modelo, ano)
+        return self._consultar(
+            ("produtos_modelo", filtro["marca"], filtro["modelo"], filtro.get("ano")),
+            lambda: list(self.produtos.find(filtro)),
+        )
+
+    def produto_por_sku(self, sku):
+        """Produto Nuvemshop que contém a variante com o SKU, ou None."""
+        return self._consultar(("produto_sku", sku), lambda: self.produtos.find_one({"variants.sku": sku}))
+
+    def precos_por_modelo(self, marca, modelo, ano=None):
+        """Documentos de precos de uma marca + modelo (+ ano), todas as cores."""
+        filtro = self._filtro_modelo(marca, modelo, ano)
+        return self._consultar(
+            ("precos_modelo", filtro["marca"], filtro["modelo"], filtro.get("ano")),
+            lambda: list(self.precos.find(filtro)),
+        )
+
+    def preco_por_sku(self, sku):
+        """Documento de precos e a variante com a referência (SKU).
+
+        Retorna dict {'documento': doc, 'variante': variante} ou None.
+        """
+        def buscar():
+            doc = self.precos.find_one({"variantes.referencia": sku})
+            if not doc:
+                return None
+            variante = next((v for v in doc.get("variantes", []) if v.get("referencia") == sku), None)
+            return {"documento": doc, "variante": variante}
+        return self._consultar(("preco_sku", sku), buscar)
+
+    def buscar(self, texto, limite=50):
+        """Busca produtos que contenham todos os termos (modelo, ano, cor, peça).
+
+        Usa o índice multikey de search_tokens com $all (sem regex nem varredura da coleção).
+        Ex: buscar("HAYABUSA 08 PRETA TNQ")
+        """
+        tokens = tokens_consulta(texto)
+        if not tokens:
+            return []
+        return self._consultar(
+            ("busca", tuple(tokens), limite),
+            lambda: list(self.produtos.find({"search_tokens": {"$all": tokens}}).limit(limite)),
+        )
+
+    def stats_cache(self):
+        """Estatísticas do cache (tamanho, acertos, falhas, geração)."""
+        return {
+            "entradas": len(self.cache),
+            "acertos": self.cache.acertos,
+            "falhas": self.cache.falhas,
+            "geracao": self.geracao,
+        }
+
+
+def criar_servidor(consulta, porta=8098, host="127.0.0.1"):
+    """Cria o servidor HTTP de consulta (JSON). Por padrão só aceita conexões locais."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, formato, *args):
+            pass
+
+        def _responder(self, status, corpo):
+            dados = json.dumps(corpo, default=str, ensure_ascii=False).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(dados)))
+            self.end_headers()
+            self.wfile.write(dados)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            partes = [unquote(p) for p in url.path.strip("/").split("/") if p]
+            params = {k: v[0] for k, v in parse_qs(url.query).items()}
+            try:
+                if partes == ["cache"]:
+                    resultado = consulta.stats_cache()
+                elif partes == ["busca"] and "q" in params:
+                    resultado = consulta.buscar(params["q"], int(params.get("limite", 50)))
+                elif len(partes) == 3 and partes[1] == "sku" and partes[0] == "produtos":
+                    resultado = consulta.produto_por_sku(partes[2])
+                elif len(partes) == 3 and partes[1] == "sku" and partes[0] == "precos":
+                    resultado = consulta.preco_por_sku(partes[2])
+                elif len(partes) == 2 and partes[0] == "produtos":
+                    resultado = consulta.produto_por_handle(partes[1])
+                elif partes in (["produtos"], ["precos"]) and "marca" in params and "modelo" in params:
+                    funcao = consulta.produtos_por_modelo if partes == ["produtos"] else consulta.precos_por_modelo
+                    resultado = funcao(params["marca"], params["modelo"], params.get("ano"))
+                else:
+                    self._responder(404, {"erro": "rota não encontrada"})
+                    return
+            except ValueError as e:
+                self._responder(400, {"erro": str(e)})
+                return
+            if resultado is None:
+                self._responder(404, {"erro": "não encontrado"})
+            else:
+                self._responder(200, resultado)
+
+    servidor = ThreadingHTTPServer((host, porta), Handler)
+    servidor.daemon_threads = True
+    return servidor
+
+
+def percentil(valores, p):
+    """Percentil (0-100) por vizinho mais próximo."""
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, round(p / 100 * (len(ordenados) - 1)))]
+
+
+def executar_benchmark(consulta, amostras=500):
+    """Mede latência p50/p99 (ms) de cada tipo de consulta sem cache (miss) e com cache (hit)."""
+    produtos = list(consulta.produtos.aggregate([
+        {"$sample": {"size": amostras}},
+        {"$project": {"handle": 1, "marca": 1, "modelo": 1, "variants.sku": 1}},
+    ]))
+    if not produtos:
+        print("Nenhum produto na coleção para medir.")
+        return
+
+    # Chaves sem repetição: uma chave repetida na rodada "miss" já estaria no cache
+    modelos = list(dict.fromkeys((p["marca"], p["modelo"]) for p in produtos if p.get("modelo")))
+    skus = list(dict.fromkeys((v["sku"],) for p in produtos for v in p.get("variants", [])[:1] if v.get("sku")))
+    consultas = {
+        "produto_por_handle": list(dict.fromkeys((p["handle"],) for p in produtos)),
+        "produtos_por_modelo": modelos,
+        "produto_por_sku": skus,
+        "precos_por_modelo": list(modelos),
+        "preco_por_sku": list(skus),
+    }
+
+    print(f"\n{'consulta':<22} {'n':>5} {'miss p50':>10} {'miss p99':>10} {'hit p50':>10} {'hit p99':>10}  (ms)")
+    for nome, argumentos in consultas.items():
+        funcao = getattr(consulta, nome)
+        random.shuffle(argumentos)
+        tempos = {"miss": [], "hit": []}
+        consulta.cache.limpar()
+        for rodada in ("miss", "hit"):
+            for args in argumentos:
+                t0 = time.perf_counter()
+                funcao(*args)
+                tempos[rodada].append((time.perf_counter() - t0) * 1000)
+        print(f"{nome:<22} {len(argumentos):>5} {percentil(tempos['miss'], 50):>10.3f} "
+              f"{percentil(tempos['miss'], 99):>10.3f} {percentil(tempos['hit'], 50):>10.3f} "
+              f"{percentil(tempos['hit'], 99):>10.3f}")
+
+
+def main():
+    """Função principal."""
+    porta = 8098
+    host = "127.0.0.1"
+    for arg in sys.argv[1:]:
+        if arg.startswith("--porta="):
+            porta = int(arg.split("=", 1)[1])
+        elif arg.startswith("--host="):
+            host = arg.split("=", 1)[1]
+
+    _, client = conectar_mongodb()
+    consulta = ConsultaCatalogo(client[DATABASE_NAME])
+
+    try:
+        if "--benchmark" in sys.argv:
+            executar_benchmark(consulta)
+        elif "--servidor" in sys.argv:
+            servidor = criar_servidor(consulta, porta, host)
+            print(f"Consulta do catálogo em http://{host}:{porta}")
+            try:
+                servidor.serve_forever()
+            except KeyboardInterrupt:
+                pass
+            finally:
+                servidor.server_close()
+        else:
+            print(__doc__)
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
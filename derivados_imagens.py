@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Geração de derivados das imagens para a loja (redimensionadas JPEG/WebP e miniatura).
+
+Os originais em "000 FAIXAS LIMPAS" costumam ser scans grandes; esta etapa gera versões
+prontas para a vitrine em um pool de processos. As saídas ficam em cache pelo id de
+conteúdo da imagem (ver hash_conteudo_imagem), então só originais novos ou alterados
+são processados.
+
+Uso (dentro do importador):
+    python import_precos.py --derivados
+"""
+
+import json
+import os
+import time
+
+# Variantes geradas: nome -> tamanho máximo (maior lado, px), formato Pillow, extensão e qualidade
+VARIANTES_DERIVADOS = {
+    "1200_jpg": {"tamanho_max": 1200, "formato": "JPEG", "extensao": "jpg", "qualidade": 85},
+    "1200_webp": {"tamanho_max": 1200, "formato": "WEBP", "extensao": "webp", "qualidade": 80},
+    "thumb_jpg": {"tamanho_max": 300, "formato": "JPEG", "extensao": "jpg", "qualidade": 80},
+}
+
+MANIFESTO = "manifest.json"
+
+
+def pasta_derivados(image_id):
+    """Retorna a pasta relativa dos derivados de uma imagem (ex: 'a3/a307566c...')."""
+    return os.path.join(image_id[:2], image_id)
+
+
+def ler_manifesto(destino_base, image_id, variantes=None):
+    """Lê o manifesto em cache de uma imagem.
+
+    Retorna o dict de derivados se o manifesto foi gerado com as mesmas variantes (nomes e
+    parâmetros: tamanho, formato, qualidade) e todos os arquivos existem, ou None.
+    """
+    variantes = variantes or VARIANTES_DERIVADOS
+    caminho = os.path.join(destino_base, pasta_derivados(image_id), MANIFESTO)
+    try:
+        with open(caminho, 'r', encoding='utf-8') as f:
+            manifesto = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(manifesto, dict) or manifesto.get("variantes") != variantes:
+        return None
+    derivados = manifesto.get("derivados") or {}
+    if set(derivados) != set(variantes):
+        return None
+    for dados in derivados.values():
+        if not os.path.exists(os.path.join(destino_base, dados["path"])):
+            return None
+    return derivados
+
+
+def gerar_derivados_imagem(caminho_origem, image_id, destino_base, variantes=None):
+    """Gera as variantes de uma imagem e grava o manifesto (executado no pool de processos).
+
+    O manifesto guarda os parâmetros das variantes junto com os derivados (ver ler_manifesto).
+    Retorna dict: {nome: {'path': relativo a destino_base, 'width', 'height', 'bytes'}}
+    """
+    from PIL import Image
+
+    variantes = variantes or VARIANTES_DERIVADOS
+    pasta_rel = pasta_derivados(image_id)
+    pasta_abs = os.path.join(destino_base, pasta_rel)
+    os.makedirs(pasta_abs, exist_ok=True)
+
+    maior = max(v["tamanho_max"] for v in variantes.values())
+    with Image.open(caminho_origem) as original:
+        # JPEG: decodificar já reduzido (1/2, 1/4, 1/8) quando o original é muito maior
+        original.draft("RGB", (maior, maior))
+        if original.mode in ("RGBA", "LA", "P"):
+            rgba = original.convert("RGBA")
+            imagem = Image.new("RGB", rgba.size, (255, 255, 255))
+            imagem.paste(rgba, mask=rgba.split()[-1])
+        else:
+            imagem = original.convert("RGB")
+
+    derivados = {}
+    # Da maior para a menor, reaproveitando a redução anterior
+    for nome, v in sorted(variantes.items(), key=lambda item: -item[1]["tamanho_max"]):
+        if imagem.width > v["tamanho_max"] or imagem.height > v["tamanho_max"]:
+            imagem.thumbnail((v["tamanho_max"], v["tamanho_max"]), Image.LANCZOS)
+        arquivo_rel = os.path.join(pasta_rel, f"{nome}.{v['extensao']}")
+        arquivo_abs = os.path.join(destino_base, arquivo_rel)
+        imagem.save(arquivo_abs, v["formato"], quality=v["qualidade"], optimize=True)
+        derivados[nome] = {
+            "path": arquivo_rel,
+            "width": imagem.width,
+            "height": imagem.height,
+            "bytes": os.path.getsize(arquivo_abs),
+        }
+
+    temporario = os.path.join(pasta_abs, f"{MANIFESTO}.tmp")
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump({"variantes": variantes, "derivados": derivados}, f)
+    os.replace(temporario, os.path.join(pasta_abs, MANIFESTO))
+    return derivados
+
+
+def gerar_derivados(produtos_nuvemshop, caminho_imagens, destino_base, max_workers=None):
+    """Gera os derivados de todas as imagens dos produtos e anota cada imagem.
+
+    Cada imagem recebe img['derivados'] = {nome: {'path', 'width', 'height', 'bytes'}}.
+    Imagens iguais (mesmo id de conteúdo) são processadas uma única vez.
+
+    Retorna dict com estatísticas: {'total', 'cache', 'gerados', 'erros', 'segundos',
+    'bytes_origem'}
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    stats = {'total': 0, 'cache': 0, 'gerados': 0, 'erros': 0, 'segundos': 0.0, 'bytes_origem': 0}
+
+    import importlib.util
+    if importlib.util.find_spec("PIL") is None:
+        print("AVISO: Pillow não instalado (pip install Pillow); derivados não gerados")
+        return stats
+
+    inicio = time.perf_counter()
+
+    # Uma origem por id de conteúdo
+    origens = {}
+    for produto in produtos_nuvemshop:
+        for img in produto.get("images", []):
+            if img['id'] not in origens:
+                origens[img['id']] = os.path.join(caminho_imagens, img['path'].lstrip('/'), img['filename'])
+    stats['total'] = len(origens)
+
+    resultados = {}
+    pendentes = []
+    for image_id, caminho in origens.items():
+        derivados = ler_manifesto(destino_base, image_id)
+        if derivados is not None:
+            resultados[image_id] = derivados
+            stats['cache'] += 1
+        else:
+            pendentes.append((image_id, caminho))
+
+    if pendentes:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futuros = {
+                executor.submit(gerar_derivados_imagem, caminho, image_id, destino_base): (image_id, caminho)
+                for image_id, caminho in pendentes
+            }
+            for futuro, (image_id, caminho) in futuros.items():
+                try:
+                    resultados[image_id] = futuro.result()
+                    stats['gerados'] += 1
+                    stats['bytes_origem'] += os.path.getsize(caminho)
+                except Exception as e:
+                    print(f"AVISO: Erro ao gerar derivados de {caminho}: {e}")
+                    stats['erros'] += 1
+
+    for produto in produtos_nuvemshop:
+        for img in produto.get("images", []):
+            if img['id'] in resultados:
+                img['derivados'] = resultados[img['id']]
+
+    stats['segundos'] = time.perf_counter() - inicio
+    return stats
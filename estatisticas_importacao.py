@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Estatísticas de uma execução do importador, calculadas em memória durante o pipeline.
+
+Contagens por marca, variantes, cobertura de imagens e de estoque saem dos documentos e
+produtos que já estão em memória; inseridos/atualizados/sem alteração e o total de cada
+coleção saem dos resumos da escrita (ver escrever_em_lotes). Nenhuma consulta ao servidor
+é feita para o relatório: count_documents, exemplos e agregação por marca só com --verify.
+
+O resumo é mostrado no console e gravado em JSON (estatisticas.json no diretório do checkpoint
+da execução).
+"""
+
+import json
+import os
+import time
+from datetime import datetime
+
+
+def percentual(parte, total):
+    return f"{parte / total * 100:.1f}%" if total else "-"
+
+
+class EstatisticasImportacao:
+    """Acumula as estatísticas de uma execução (dict serializável em JSON em self.dados)."""
+
+    def __init__(self, run_id, modo):
+        self.inicio = time.perf_counter()
+        self.dados = {
+            "run_id": run_id,
+            "modo": modo,
+            "iniciado_em": datetime.now().isoformat(timespec="seconds"),
+            "precos": None,
+            "nuvemshop": None,
+            "escrita": {},
+            "imagens_compartilhadas": None,
+            "verificacao": None,
+        }
+
+    def registrar_documentos(self, documentos):
+        """Contagens da coleção precos: documentos e variantes, no total e por marca."""
+        por_marca = {}
+        for doc in documentos:
+            marca = por_marca.setdefault(doc["marca"], {"documentos": 0, "variantes": 0})
+            marca["documentos"] += 1
+            marca["variantes"] += len(doc.get("variantes", []))
+        self.dados["precos"] = {
+            "documentos": len(documentos),
+            "variantes": sum(marca["variantes"] for marca in por_marca.values()),
+            "por_marca": dict(sorted(por_marca.items())),
+        }
+
+    def registrar_produtos(self, produtos):
+        """Contagens dos produtos Nuvemshop: variantes e cobertura de imagens e de estoque."""
+        campos = ("produtos", "com_imagens", "imagens", "variantes", "variantes_com_imagem", "variantes_com_estoque")
+        por_marca = {}
+        for produto in produtos:
+            marca = por_marca.setdefault(produto.get("marca"), dict.fromkeys(campos, 0))
+            variantes = produto.get("variants", [])
+            marca["produtos"] += 1
+            marca["com_imagens"] += 1 if produto.get("images") else 0
+            marca["imagens"] += len(produto.get("images", []))
+            marca["variantes"] += len(variantes)
+            marca["variantes_com_imagem"] += sum(1 for var in variantes if var.get("imageId"))
+            marca["variantes_com_estoque"] += sum(1 for var in variantes if var.get("stock"))
+        totais = {campo: sum(marca[campo] for marca in por_marca.values()) for campo in campos}
+        self.dados["nuvemshop"] = {**totais, "por_marca": dict(sorted(por_marca.items(), key=lambda i: str(i[0])))}
+
+    def registrar_escrita(self, colecao, resumo):
+        """Resumo da escrita de uma coleção (None: gravada em execução anterior, sem resumo)."""
+        self.dados["escrita"][colecao] = resumo
+
+    def registrar_imagens_compartilhadas(self, total, compartilhadas):
+        self.dados["imagens_compartilhadas"] = {"total": total, "compartilhadas": compartilhadas}
+
+    def total_colecao(self, colecao):
+        """Total de documentos na coleção depois da escrita, ou None se não se sabe (w=0)."""
+        resumo = self.dados["escrita"].get(colecao)
+        return resumo.get("total_colecao") if resumo else None
+
+    def imprimir(self):
+        print("\n" + "=" * 60)
+        print("Resumo da importação")
+        print("=" * 60)
+
+        for colecao, resumo in self.dados["escrita"].items():
+            print(f"\n{colecao}:")
+            if resumo is None:
+                print("  Gravada em execução anterior (sem resumo da escrita)")
+            elif not resumo["confirmado"]:
+                print(f"  Operações enviadas (sem confirmação, w=0): {resumo['operacoes']}")
+            else:
+                print(f"  Inseridos: {resumo['inseridos']}  Atualizados: {resumo['atualizados']}  "
+                      f"Sem alteração: {resumo['sem_alteracao']}")
+                if resumo.get("ja_inseridos"):
+                    print(f"  Já inseridos (lote reenviado após falha): {resumo['ja_inseridos']}")
+                if resumo.get("lotes_retomados"):
+                    print(f"  Lotes retomados de execução anterior: {resumo['lotes_retomados']}")
+                print(f"  Total na coleção: {resumo['total_colecao']}")
+
+        precos = self.dados["precos"]
+        if precos:
+            print(f"\nDocumentos: {precos['documentos']} ({precos['variantes']} variantes)")
+
+        nuvemshop = self.dados["nuvemshop"]
+        if nuvemshop:
+            print(f"Produtos Nuvemshop: {nuvemshop['produtos']} ({nuvemshop['variantes']} variantes)")
+            print(f"  Com imagens: {nuvemshop['com_imagens']} "
+                  f"({percentual(nuvemshop['com_imagens'], nuvemshop['produtos'])}), "
+                  f"{nuvemshop['imagens']} imagens")
+            print(f"  Variantes com imagem: {nuvemshop['variantes_com_imagem']} "
+                  f"({percentual(nuvemshop['variantes_com_imagem'], nuvemshop['variantes'])})")
+            print(f"  Variantes com estoque: {nuvemshop['variantes_com_estoque']} "
+                  f"({percentual(nuvemshop['variantes_com_estoque'], nuvemshop['variantes'])})")
+
+        compartilhadas = self.dados["imagens_compartilhadas"]
+        if compartilhadas:
+            print(f"Imagens distintas (por conteúdo): {compartilhadas['total']} "
+                  f"({compartilhadas['compartilhadas']} compartilhadas entre produtos)")
+
+        if precos:
+            produtos_marca = nuvemshop["por_marca"] if nuvemshop else {}
+            print(f"\n{'Marca':<20} {'documentos':>10} {'variantes':>10} {'c/ imagens':>11} {'c/ estoque':>11}")
+            for marca, contagem in precos["por_marca"].items():
+                produtos = produtos_marca.get(marca, {})
+                print(f"{marca:<20} {contagem['documentos']:>10} {contagem['variantes']:>10} "
+                      f"{percentual(produtos.get('com_imagens', 0), produtos.get('produtos', 0)):>11} "
+                      f"{percentual(produtos.get('variantes_com_estoque', 0), produtos.get('variantes', 0)):>11}")
+
+    def salvar(self, caminho):
+        """Grava o resumo em JSON (arquivo temporário + rename)."""
+        self.dados["duracao_segundos"] = round(time.perf_counter() - self.inicio, 1)
+        self.dados["concluido_em"] = datetime.now().isoformat(timespec="seconds")
+        os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+        temporario = f"{caminho}.tmp"
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(self.dados, f, ensure_ascii=False, indent=2, default=str)
+        os.replace(temporario, caminho)
+
+
+def verificar_no_servidor(estatisticas, colecao, colecao_nuvemshop):
+    """Consultas de conferência no servidor (--verify): totais, documentos por marca e exemplos.
+
+    Compara com o que foi calculado em memória e registra o resultado em estatisticas.dados.
+    """
+    print("\n" + "=" * 60)
+    print("Verificação no servidor (--verify)")
+    print("=" * 60)
+    verificacao = {}
+
+    for nome, col in ((colecao.name, colecao), (colecao_nuvemshop.name, colecao_nuvemshop)):
+        total = col.count_documents({})
+        esperado = estatisticas.total_colecao(nome)
+        confere = esperado is None or total == esperado
+        verificacao[nome] = {"total": total, "esperado": esperado, "confere": confere}
+        print(f"Total na coleção {nome}: {total}"
+              + ("" if esperado is None else f" (esperado: {esperado}, {'confere' if confere else 'DIVERGE'})"))
+
+    # Documentos por marca: no modo UPSERT a coleção pode ter documentos de importações anteriores
+    print("\nDocumentos por marca (servidor / esta importação):")
+    pipeline = [{"$group": {"_id": "$marca", "total": {"$sum": 1}}}]
+    por_marca = {item["_id"]: item["total"] for item in colecao.aggregate(pipeline)}
+    calculado = (estatisticas.dados["precos"] or {}).get("por_marca", {})
+    for marca in sorted(set(por_marca) | set(calculado), key=str):
+        print(f"  {marca}: {por_marca.get(marca, 0)} / {calculado.get(marca, {}).get('documentos', 0)}")
+    verificacao["por_marca"] = {str(marca): total for marca, total in por_marca.items()}
+
+    # Mostrar exemplo
+    print("\nExemplo de documento inserido:")
+    exemplo = colecao.find_one()
+    if exemplo:
+        print(f"  marca: {exemplo.get('marca')}")
+        print(f"  modelo: {exemplo.get('modelo')}")
+        print(f"  cor: {exemplo.get('cor')}")
+        print(f"  variantes: {len(exemplo.get('variantes', []))} itens")
+        for i, var in enumerate(exemplo.get('variantes', [])[:3]):
+            print(f"    [{i}] {var.get('peca')} - R$ {var.get('preco')}")
+        if len(exemplo.get('variantes', [])) > 3:
+            print(f"    ... e mais {len(exemplo.get('variantes', [])) - 3} variantes")
+        print(f"  data_importacao: {exemplo.get('data_importacao')}")
+
+    # Mostrar exemplo Nuvemshop
+    print("\nExemplo de produto Nuvemshop:")
+    exemplo_ns = colecao_nuvemshop.find_one()
+    if exemplo_ns:
+        print(f"  name: {exemplo_ns.get('name')}")
+        print(f"  handle: {exemplo_ns.get('handle')}")
+        print(f"  variants: {len(exemplo_ns.get('variants', []))} itens")
+        for i, var in enumerate(exemplo_ns.get('variants', [])[:2]):
+            print(f"    [{i}] sku: {var.get('sku')} - R$ {var.get('price')}")
+        if len(exemplo_ns.get('variants', [])) > 2:
+            print(f"    ... e mais {len(exemplo_ns.get('variants', [])) - 2} variantes")
+        print(f"  images: {len(exemplo_ns.get('images', []))} imagens")
+        for i, img in enumerate(exemplo_ns.get('images', [])[:3]):
+            print(f"    [{i}] {img.get('filename')} (path: {img.get('path')})")
+        if len(exemplo_ns.get('images', [])) > 3:
+            print(f"    ... e mais {len(exemplo_ns.get('images', [])) - 3} imagens")
+
+    # Buscar um produto com imagens para mostrar
+    exemplo_com_img = colecao_nuvemshop.find_one({"images.0": {"$exists": True}})
+    if exemplo_com_img and exemplo_com_img != exemplo_ns:
+        print("\nExemplo de produto COM imagens:")
+        print(f"  name: {exemplo_com_img.get('name')}")
+        print(f"  images: {len(exemplo_com_img.get('images', []))} imagens")
+        for i, img in enumerate(exemplo_com_img.get('images', [])[:3]):
+            print(f"    [{i}] {img.get('filename')} (path: {img.get('path')})")
+
+    estatisticas.dados["verificacao"] = verificacao
+    return verificacao
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Leitura da tabela de preços exportada pelo ERP em CSV ou Parquet, alternativa à planilha xlsx.
+
+EXCEL_PATH pode apontar para:
+    tabela.xlsx              - planilha, uma aba por marca (leitura padrão)
+    SUZUKI.csv / .parquet    - um arquivo por marca (o nome do arquivo faz o papel da aba)
+    tabela.csv / .parquet    - um arquivo com a coluna MARCA (ou ABA) e as colunas A-G
+    pasta/                   - pasta com arquivos .csv/.parquet, lidos em ordem alfabética
+
+As colunas A-G (modelo, cor, kit/conjunto, elemento, preço, localização, referência) são as
+primeiras colunas do arquivo, fora a de marca; a primeira linha do CSV é o cabeçalho, como na
+planilha. As linhas de cada marca passam pelas mesmas regras do xlsx (segmentar_aba: linhas
+separadoras, linhas de marca da aba OUTRAS, blocos e variantes).
+
+No CSV todas as células são texto: o preço é convertido para número quando está no formato
+de CSV_DECIMAL (padrão ',': '1.234,50', '25,00', '10'); outros textos ficam como texto e
+valem 0.0, como uma célula de texto na planilha.
+
+Os arquivos são lidos em lotes (pyarrow: blocos do CSV e row groups/lotes do Parquet), sem
+carregar o arquivo inteiro como tabela. Cada lote é segmentado assim que lido: só o bloco
+ainda aberto de cada marca (depois da última linha separadora) passa para o lote seguinte.
+Sem pyarrow, o CSV é lido com o módulo csv.
+"""
+
+import csv
+import os
+import re
+from decimal import Decimal
+
+from import_precos import config, eh_linha_marca, eh_linha_separadora, segmentar_aba
+
+EXTENSOES_TABELA = ('.csv', '.parquet')
+COLUNAS = 7                         # A-G
+COLUNA_PRECO = 4
+NOMES_COLUNA_MARCA = ("MARCA", "ABA")
+LINHAS_POR_LOTE = 65536             # lote do Parquet e do leitor csv
+BYTES_POR_BLOCO_CSV = 8 * 1024 * 1024
+
+CSV_ENCODING = config("CSV_ENCODING", "utf-8-sig")
+CSV_DELIMITADOR = config("CSV_DELIMITADOR", "")   # vazio: detectar pelo cabeçalho (; , ou tab)
+CSV_DECIMAL = config("CSV_DECIMAL", ",")          # separador decimal dos preços no CSV: , ou .
+
+
+def eh_tabela_colunar(caminho):
+    """True se o caminho é um CSV/Parquet ou uma pasta com esses arquivos."""
+    return os.path.isdir(caminho) or caminho.lower().endswith(EXTENSOES_TABELA)
+
+
+def listar_arquivos(caminho):
+    """Arquivos .csv/.parquet do caminho (o próprio arquivo, ou os da pasta em ordem alfabética)."""
+    if not os.path.isdir(caminho):
+        return [caminho]
+    return [
+        os.path.join(caminho, nome)
+        for nome in sorted(os.listdir(caminho))
+        if nome.lower().endswith(EXTENSOES_TABELA)
+    ]
+
+
+def formato_numero(decimal):
+    """Regex de um número com separador decimal `decimal` e milhar opcional (o outro de . e ,)."""
+    milhar = re.escape("." if decimal == "," else ",")
+    decimal = re.escape(decimal)
+    return re.compile(rf"-?(?:\d{{1,3}}(?:{milhar}\d{{3}})+|\d+)(?:{decimal}\d+)?")
+
+
+_FORMATO_PRECO = formato_numero(CSV_DECIMAL)
+
+
+def converter_preco(valor):
+    """Preço em texto (CSV) para número, no formato de CSV_DECIMAL.
+
+    Com ',' (padrão): '10', '25,50', '1.234,50' e '1.234' (mil e duzentos e trinta e quatro).
+    Com '.': '10', '25.50', '1,234.50'. Outros textos ficam como estão (preço 0.0, como
+    uma célula de texto na planilha); vazio vira None. Decimal (coluna decimal do Parquet)
+    vira float, já que o conversor só aceita int/float como preço.
+    """
+    if isinstance(valor, Decimal):
+        return float(valor)
+    if not isinstance(valor, str):
+        return valor
+    texto = valor.strip()
+    if not texto:
+        return None
+    if not _FORMATO_PRECO.fullmatch(texto):
+        return valor
+    milhar = "." if CSV_DECIMAL == "," else ","
+    return float(texto.replace(milhar, "").replace(CSV_DECIMAL, "."))
+
+
+def normalizar_colunas(colunas):
+    """Aplica às colunas A-G de um lote os tipos que a planilha teria.
+
+    Célula vazia ('') vira None e o preço em texto ou Decimal vira número, como nas células
+    do xlsx.
+    """
+    normalizadas = []
+    for i, valores in enumerate(colunas):
+        if i == COLUNA_PRECO:
+            normalizadas.append([converter_preco(v) for v in valores])
+        else:
+            normalizadas.append([None if v == "" else v for v in valores])
+    return normalizadas
+
+
+def detectar_delimitador(linha_cabecalho):
+    if CSV_DELIMITADOR:
+        return CSV_DELIMITADOR
+    return max((';', ',', '\t'), key=linha_cabecalho.count)
+
+
+def ler_lotes_csv(caminho):
+    """Lê o CSV em lotes. Retorna (nomes_colunas, gerador de lotes: lista de colunas)."""
+    with open(caminho, 'r', encoding=CSV_ENCODING, newline='') as f:
+        linha_cabecalho = f.readline()
+    delimitador = detectar_delimitador(linha_cabecalho)
+    nomes = next(csv.reader([linha_cabecalho], delimiter=delimitador), [])
+
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pa_csv
+    except ImportError:
+        return nomes, _lotes_csv_stdlib(caminho, delimitador, len(nomes))
+
+    # Nomes sintéticos: o cabeçalho do ERP pode ter nomes vazios ou repetidos
+    nomes_arrow = [f"c{i}" for i in range(len(nomes))]
+    encoding = "utf8" if CSV_ENCODING.lower().replace("-", "") in ("utf8", "utf8sig") else CSV_ENCODING
+    leitor = pa_csv.open_csv(
+        caminho,
+        read_options=pa_csv.ReadOptions(
+            encoding=encoding, skip_rows=1, column_names=nomes_arrow, block_size=BYTES_POR_BLOCO_CSV
+        ),
+        parse_options=pa_csv.ParseOptions(delimiter=delimitador),
+        # Tudo como texto: os tipos são aplicados por normalizar_colunas, como no leitor csv
+        convert_options=pa_csv.ConvertOptions(
+            column_types={nome: pa.string() for nome in nomes_arrow},
+            strings_can_be_null=False,
+            quoted_strings_can_be_null=False,
+        ),
+    )
+
+    def lotes():
+        for lote in leitor:
+            yield [coluna.to_pylist() for coluna in lote.columns]
+
+    return nomes, lotes()
+
+
+def _lotes_csv_stdlib(caminho, delimitador, largura):
+    """Leitura do CSV sem pyarrow, em lotes de LINHAS_POR_LOTE linhas."""
+    with open(caminho, 'r', encoding=CSV_ENCODING, newline='') as f:
+        leitor = csv.reader(f, delimiter=delimitador)
+        next(leitor, None)  # cabeçalho
+        lote = []
+        for linha in leitor:
+            # Linhas curtas (colunas finais vazias omitidas) completadas com ''
+            lote.append(linha + [""] * (largura - len(linha)))
+            if len(lote) == LINHAS_POR_LOTE:
+                yield [list(coluna) for coluna in zip(*lote)]
+                lote = []
+        if lote:
+            yield [list(coluna) for coluna in zip(*lote)]
+
+
+def ler_lotes_parquet(caminho):
+    """Lê o Parquet em lotes. Retorna (nomes_colunas, gerador de lotes: lista de colunas)."""
+    import pyarrow.parquet as pq
+    arquivo = pq.ParquetFile(caminho)
+
+    def lotes():
+        for lote in arquivo.iter_batches(batch_size=LINHAS_POR_LOTE):
+            yield [coluna.to_pylist() for coluna in lote.columns]
+
+    return arquivo.schema_arrow.names, lotes()
+
+
+def lotes_por_marca(caminho):
+    """Lê um arquivo CSV/Parquet em lotes e agrupa as linhas (colunas A-G) de cada lote por marca/aba.
+
+    Gera, para cada lote, um dict {marca_aba: [linhas]} na ordem em que as marcas aparecem.
+    """
+    if caminho.lower().endswith('.parquet'):
+        nomes, lotes = ler_lotes_parquet(caminho)
+    else:
+        nomes, lotes = ler_lotes_csv(caminho)
+
+    nomes_norm = [str(nome).strip().upper() for nome in nomes]
+    indice_marca = next((i for i, nome in enumerate(nomes_norm) if nome in NOMES_COLUNA_MARCA), None)
+    indices_dados = [i for i in range(len(nomes)) if i != indice_marca][:COLUNAS]
+    if len(indices_dados) < COLUNAS:
+        print(f"AVISO: {caminho} tem {len(indices_dados)} colunas de dados, esperadas {COLUNAS} (A-G)")
+
+    # Arquivo por marca: o nome do arquivo faz o papel do nome da aba
+    marca_arquivo = os.path.splitext(os.path.basename(caminho))[0].upper()
+    sem_marca = 0
+
+    for lote in lotes:
+        colunas = normalizar_colunas([lote[i] for i in indices_dados])
+        colunas += [[None] * len(lote[0])] * (COLUNAS - len(colunas))
+        linhas = list(zip(*colunas))
+        if indice_marca is None:
+            yield {marca_arquivo: linhas}
+            continue
+        marcas = {}
+        for marca, linha in zip(lote[indice_marca], linhas):
+            marca = str(marca).strip().upper() if marca is not None else ""
+            if not marca:
+                sem_marca += 1
+                continue
+            marcas.setdefault(marca, []).append(linha)
+        yield marcas
+
+    if sem_marca:
+        print(f"AVISO: {sem_marca} linhas sem marca ignoradas em {caminho}")
+
+
+def separar_bloco_aberto(marca_aba, linhas, inicio=0):
+    """Divide as linhas de uma marca em (blocos fechados, bloco aberto).
+
+    Os blocos fechados vão até a última linha separadora (ou linha de marca, na aba OUTRAS)
+    e podem ser segmentados sem as linhas seguintes. Na aba OUTRAS o bloco aberto começa
+    pela última linha de marca, para continuar com a mesma marca no próximo lote.
+    A busca pela última separadora para em `inicio` (as linhas antes são o bloco aberto
+    do lote anterior, que não tem separadoras).
+    """
+    eh_aba_outras = (marca_aba == "OUTRAS")
+    for i in range(len(linhas) - 1, inicio - 1, -1):
+        if eh_aba_outras and eh_linha_marca(linhas[i]):
+            return linhas[:i], linhas[i:]
+        if eh_linha_separadora(linhas[i]):
+            aberto = linhas[i + 1:]
+            if eh_aba_outras:
+                linha_marca = next((linha for linha in reversed(linhas[:i]) if eh_linha_marca(linha)), None)
+                if linha_marca is not None:
+                    aberto.insert(0, linha_marca)
+            return linhas[:i + 1], aberto
+    return [], linhas
+
+
+def documentos_por_marca(caminho, debug=False, debug_modelo=None):
+    """Segmenta um arquivo CSV/Parquet lote a lote.
+
+    Retorna dict {marca_aba: {"linhas": n, "documentos": [...]}} na ordem em que as marcas
+    aparecem. Entre um lote e outro só fica em memória o bloco aberto de cada marca.
+    """
+    marcas = {}
+    abertos = {}
+    for lote in lotes_por_marca(caminho):
+        for marca_aba, linhas in lote.items():
+            marca = marcas.setdefault(marca_aba, {"linhas": 0, "documentos": []})
+            marca["linhas"] += len(linhas)
+            aberto = abertos.get(marca_aba, [])
+            fechados, abertos[marca_aba] = separar_bloco_aberto(marca_aba, aberto + linhas, len(aberto))
+            if fechados:
+                marca["documentos"].extend(segmentar_aba(marca_aba, fechados, debug, debug_modelo))
+    for marca_aba, aberto in abertos.items():
+        if aberto:
+            marcas[marca_aba]["documentos"].extend(segmentar_aba(marca_aba, aberto, debug, debug_modelo))
+    return marcas
+
+
+def processar_tabela_colunar(caminho, debug=False, debug_modelo=None):
+    """Lê os arquivos CSV/Parquet do caminho e retorna os documentos (sem consolidar)."""
+    documentos = []
+    arquivos = listar_arquivos(caminho)
+    if not arquivos:
+        print(f"AVISO: Nenhum arquivo .csv/.parquet em: {caminho}")
+    for arquivo in arquivos:
+        for marca_aba, marca in documentos_por_marca(arquivo, debug, debug_modelo).items():
+            print(f"Processando aba: {marca_aba} ({marca['linhas']} linhas) [{os.path.basename(arquivo)}]")
+            documentos.extend(marca["documentos"])
+    return documentos
@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+"""
+Publica os produtos da coleção produtos_nuvemshop na API Nuvemshop.
+
+Envio assíncrono com pool de conexões HTTP (aiohttp), concorrência limitada, rate limit
+por token bucket e retentativas com backoff em 429/5xx. A publicação é idempotente pelo
+handle: o id remoto e o hash do payload ficam salvos no produto (campo 'nuvemshop'), e
+produtos sem id são procurados por handle na API antes de criar. Um POST que falhou com
+5xx ou erro de rede (pode ter chegado à loja) só é reenviado depois de uma nova busca
+pelo handle; 429 e conexão recusada são reenviados direto.
+
+Uso:
+    python publicador_nuvemshop.py                  - Publica só produtos alterados
+    python publicador_nuvemshop.py --todos          - Publica todos os produtos
+    python publicador_nuvemshop.py --stub --sinteticos=2000
+                                                    - Teste offline contra o stub local
+Opções: --concorrencia=8 --taxa=2 --capacidade=40 --limite=N
+"""
+
+import asyncio
+import hashlib
+import json
+import random
+import sys
+import time
+from datetime import datetime
+from urllib.parse import quote
+
+from pymongo import UpdateOne
+
+from import_precos import (
+    COLLECTION_NUVEMSHOP,
+    DATABASE_NAME,
+    carregar_templates_descricao,
+    config,
+    conectar_mongodb,
+    renderizar_descricao_produto,
+)
+
+NUVEMSHOP_API_URL = config("NUVEMSHOP_API_URL", "https://api.tiendanube.com/v1")
+NUVEMSHOP_STORE_ID = config("NUVEMSHOP_STORE_ID", "")
+NUVEMSHOP_ACCESS_TOKEN = config("NUVEMSHOP_ACCESS_TOKEN", "")
+NUVEMSHOP_USER_AGENT = config("NUVEMSHOP_USER_AGENT", "Moto Faixxa Importador (contato@motofaixxa.com.br)")
+# URL pública onde os derivados/originais das imagens são servidos (sem ela, imagens não são enviadas)
+NUVEMSHOP_IMAGES_BASE_URL = config("NUVEMSHOP_IMAGES_BASE_URL", "")
+
+# Limites padrão da API: balde de 40 requisições esvaziando 2 por segundo
+TAXA_PADRAO = 2.0
+CAPACIDADE_PADRAO = 40
+CONCORRENCIA_PADRAO = 8
+MAX_TENTATIVAS = 6
+TAMANHO_LOTE_MONGO = 500
+
+
+class ErroPublicacao(Exception):
+    """Falha definitiva ao publicar um produto (após as retentativas)."""
+
+
+class ResultadoIncerto(ErroPublicacao):
+    """Requisição não idempotente sem resposta válida (5xx/erro de rede): pode ter sido aplicada."""
+
+
+class TokenBucket:
+    """Token bucket assíncrono: `taxa` fichas por segundo, acumulando até `capacidade`."""
+
+    def __init__(self, taxa, capacidade):
+        self.taxa = taxa
+        self.capacidade = capacidade
+        self.fichas = float(capacidade)
+        self.ultimo = time.monotonic()
+        self.bloqueado_ate = 0.0
+        self._lock = asyncio.Lock()
+
+    async def adquirir(self):
+        """Aguarda até haver uma ficha disponível e a consome."""
+        async with self._lock:
+            while True:
+                agora = time.monotonic()
+                if agora < self.bloqueado_ate:
+                    await asyncio.sleep(self.bloqueado_ate - agora)
+                    continue
+                self.fichas = min(self.capacidade, self.fichas + (agora - self.ultimo) * self.taxa)
+                self.ultimo = agora
+                if self.fichas >= 1:
+                    self.fichas -= 1
+                    return
+                await asyncio.sleep((1 - self.fichas) / self.taxa)
+
+    def pausar(self, segundos):
+        """Esvazia o balde e bloqueia novas fichas (servidor respondeu 429)."""
+        self.fichas = 0.0
+        self.ultimo = time.monotonic() + segundos
+        self.bloqueado_ate = max(self.bloqueado_ate, self.ultimo)
+
+
+def tempo_espera(cabecalhos, tentativa):
+    """Calcula a espera antes da próxima tentativa.
+
+    Usa Retry-After ou x-rate-limit-reset (ms) quando presentes; senão backoff
+    exponencial com jitter (0.5s, 1s, 2s... até 30s).
+    """
+    if cabecalhos:
+        if cabecalhos.get("Retry-After"):
+            try:
+                return float(cabecalhos["Retry-After"])
+            except ValueError:
+                pass
+        if cabecalhos.get("x-rate-limit-reset"):
+            try:
+                return int(cabecalhos["x-rate-limit-reset"]) / 1000 + random.uniform(0, 0.25)
+            except ValueError:
+                pass
+    return min(30.0, 0.5 * 2 ** (tentativa - 1)) * random.uniform(0.5, 1.0)
+
+
+def montar_payload_produto(produto, templates=None):
+    """Monta o payload da API a partir do documento de produtos_nuvemshop."""
+    variantes = []
+    for var in produto.get("variants", []):
+        variantes.append({
+            "sku": var.get("sku"),
+            "price": f"{var.get('price') or 0.0:.2f}",
+            "stock_management": var.get("stock_management", True),
+            "stock": var.get("stock", 0),
+            "values": var.get("values", []),
+            "weight": produto.get("weight"),
+            "width": produto.get("width"),
+            "height": produto.get("height"),
+            "depth": produto.get("depth"),
+        })
+
+    payload = {
+        "name": produto["name"],
+        "description": {"pt": renderizar_descricao_produto(produto, templates)},
+        "handle": {"pt": produto["handle"]},
+        "published": produto.get("published", True),
+        "requires_shipping": produto.get("requires_shipping", True),
+        "attributes": produto.get("attributes", []),
+        "variants": variantes,
+    }
+
+    if NUVEMSHOP_IMAGES_BASE_URL:
+        imagens = []
+        for img in produto.get("images", []):
+            derivado = img.get("derivados", {}).get("1200_jpg")
+            caminho = derivado["path"] if derivado else f"{img['path'].lstrip('/')}/{img['filename']}"
+            imagens.append({
+                "src": f"{NUVEMSHOP_IMAGES_BASE_URL.rstrip('/')}/{quote(caminho)}",
+                "position": img["position"],
+            })
+        payload["images"] = imagens
+
+    return payload
+
+
+def hash_payload(payload):
+    """Hash estável do payload (detecta produtos alterados desde a última publicação)."""
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+async def requisitar(sessao, metodo, url, balde, stats, corpo=None, idempotente=True):
+    """Faz uma requisição respeitando o rate limit, com retentativas em 429/5xx/erros de rede.
+
+    Retorna (status, json). Erros 4xx (exceto 429) são retornados para o chamador tratar.
+    Com idempotente=False (POST), só 429 e conexão recusada são reenviados aqui; em 5xx ou
+    erro de rede com a conexão aberta levanta ResultadoIncerto e o chamador decide.
+    """
+    import aiohttp
+
+    for tentativa in range(1, MAX_TENTATIVAS + 1):
+        await balde.adquirir()
+        foi_429 = False
+        try:
+            async with sessao.request(metodo, url, json=corpo) as resp:
+                texto = await resp.text()
+                if resp.status == 429:
+                    stats["429"] += 1
+                    foi_429 = True
+                    balde.pausar(tempo_espera(resp.headers, tentativa))
+                elif resp.status >= 500:
+                    stats["5xx"] += 1
+                    if not idempotente:
+                        raise ResultadoIncerto(f"{metodo} {url}: HTTP {resp.status}")
+                else:
+                    try:
+                        return resp.status, (json.loads(texto) if texto else None)
+                    except ValueError as e:
+                        raise ErroPublicacao(
+                            f"{metodo} {url}: HTTP {resp.status}, resposta não é JSON: {texto[:200]!r}"
+                        ) from e
+        except aiohttp.ClientConnectorError as e:
+            # Conexão não estabelecida: a requisição não chegou à loja, reenviar é seguro
+            stats["erros_rede"] += 1
+            if tentativa == MAX_TENTATIVAS:
+                raise ErroPublicacao(f"{metodo} {url}: {e}") from e
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            stats["erros_rede"] += 1
+            if not idempotente:
+                raise ResultadoIncerto(f"{metodo} {url}: {e!r}") from e
+            if tentativa == MAX_TENTATIVAS:
+                raise ErroPublicacao(f"{metodo} {url}: {e}") from e
+
+        if tentativa < MAX_TENTATIVAS:
+            stats["retentativas"] += 1
+            # Em 429 o balde já foi pausado; nas demais falhas, backoff exponencial
+            if not foi_429:
+                await asyncio.sleep(tempo_espera(None, tentativa))
+
+    raise ErroPublicacao(f"{metodo} {url}: esgotadas {MAX_TENTATIVAS} tentativas")
+
+
+async def buscar_por_handle(sessao, url_loja, handle, balde, stats):
+    """Id do produto com o handle na loja, ou None."""
+    status, encontrados = await requisitar(
+        sessao, "GET", f"{url_loja}/products?handle={quote(handle)}", balde, stats
+    )
+    if status == 200 and encontrados:
+        return encontrados[0]["id"]
+    return None
+
+
+async def criar_produto(sessao, url_loja, handle, payload, balde, stats):
+    """Cria o produto (POST) e retorna o id remoto.
+
+    POST não é idempotente: se a tentativa termina sem resposta válida (5xx/erro de rede), o
+    produto pode ter sido criado. Antes de reenviar, procura de novo pelo handle.
+    """
+    for tentativa in range(1, MAX_TENTATIVAS + 1):
+        try:
+            status, resposta = await requisitar(
+                sessao, "POST", f"{url_loja}/products", balde, stats, payload, idempotente=False
+            )
+        except ResultadoIncerto as e:
+            remoto_id = await buscar_por_handle(sessao, url_loja, handle, balde, stats)
+            if remoto_id:
+                return remoto_id  # O POST chegou à loja
+            if tentativa == MAX_TENTATIVAS:
+                raise ErroPublicacao(f"POST {handle}: {e}") from e
+            stats["retentativas"] += 1
+            await asyncio.sleep(tempo_espera(None, tentativa))
+            continue
+        if status >= 400:
+            raise ErroPublicacao(f"POST {handle}: HTTP {status} {resposta}")
+        return resposta["id"]
+
+
+async def publicar_produto(sessao, url_loja, produto, templates, balde, stats, forcar=False):
+    """Publica um produto (cria ou atualiza). Retorna dict 'nuvemshop' atualizado ou None se pulado."""
+    payload = montar_payload_produto(produto, templates)
+    hash_atual = hash_payload(payload)
+    publicado = produto.get("nuvemshop") or {}
+
+    if not forcar and publicado.get("hash") == hash_atual:
+        stats["pulados"] += 1
+        return None
+
+    # Idempotência por handle: id salvo localmente ou busca na API antes de criar
+    remoto_id = publicado.get("id") or await buscar_por_handle(sessao, url_loja, produto["handle"], balde, stats)
+
+    if remoto_id:
+        # Imagens só são enviadas na criação (evita reenvio a cada atualização)
+        dados = {k: v for k, v in payload.items() if k != "images"}
+        status, resposta = await requisitar(sessao, "PUT", f"{url_loja}/products/{remoto_id}", balde, stats, dados)
+        if status == 404:
+            remoto_id = None  # Removido na loja: recriar
+        elif status >= 400:
+            raise ErroPublicacao(f"PUT {produto['handle']}: HTTP {status} {resposta}")
+        else:
+            stats["atualizados"] += 1
+
+    if not remoto_id:
+        remoto_id = await criar_produto(sessao, url_loja, produto["handle"], payload, balde, stats)
+        stats["criados"] += 1
+
+    return {"id": remoto_id, "hash": hash_atual, "publicado_em": datetime.now()}
+
+
+async def publicar_produtos(produtos, url_loja, token, templates=None, concorrencia=CONCORRENCIA_PADRAO,
+                            taxa=TAXA_PADRAO, capacidade=CAPACIDADE_PADRAO, forcar=False, ao_publicar=None):
+    """Publica uma lista de produtos com `concorrencia` workers e rate limit compartilhado.
+
+    ao_publicar(produto, dados_nuvemshop) é chamado a cada produto publicado com sucesso; pode
+    ser uma corrotina (aguardada pelo worker, sem bloquear os demais).
+    Retorna dict com estatísticas.
+    """
+    import aiohttp
+
+    stats = {"total": len(produtos), "criados": 0, "atualizados": 0, "pulados": 0, "falhas": 0,
+             "retentativas": 0, "429": 0, "5xx": 0, "erros_rede": 0, "segundos": 0.0}
+    balde = TokenBucket(taxa, capacidade)
+    fila = asyncio.Queue()
+    for produto in produtos:
+        fila.put_nowait(produto)
+
+    cabecalhos = {
+        "Authentication": f"bearer {token}",
+        "User-Agent": NUVEMSHOP_USER_AGENT,
+        "Content-Type": "application/json",
+    }
+    conector = aiohttp.TCPConnector(limit=concorrencia, keepalive_timeout=60)
+    timeout = aiohttp.ClientTimeout(total=60)
+
+    async def worker():
+        while True:
+            try:
+                produto = fila.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            try:
+                dados = await publicar_produto(sessao, url_loja, produto, templates, balde, stats, forcar)
+                if dados and ao_publicar:
+                    resultado = ao_publicar(produto, dados)
+                    if asyncio.iscoroutine(resultado):
+                        await resultado
+            except ErroPublicacao as e:
+                stats["falhas"] += 1
+                print(f"  ERRO: {e}")
+            except Exception as e:
+                # Erro inesperado (payload, resposta, gravação do progresso): conta a falha do
+                # produto e segue, sem derrubar os outros workers
+                stats["falhas"] += 1
+                print(f"  ERRO: {produto.get('handle')}: {type(e).__name__}: {e}")
+
+    inicio = time.perf_counter()
+    async with aiohttp.ClientSession(connector=conector, headers=cabecalhos, timeout=timeout) as sessao:
+        await asyncio.gather(*(worker() for _ in range(concorrencia)))
+    stats["segundos"] = time.perf_counter() - inicio
+    return stats
+
+
+def imprimir_stats(stats):
+    """Mostra o resumo da publicação."""
+    enviados = stats["criados"] + stats["atualizados"]
+    print(f"\n  Produtos: {stats['total']} (criados: {stats['criados']}, atualizados: {stats['atualizados']}, "
+          f"sem alteração: {stats['pulados']}, falhas: {stats['falhas']})")
+    print(f"  Retentativas: {stats['retentativas']} (429: {stats['429']}, 5xx: {stats['5xx']}, "
+          f"rede: {stats['erros_rede']})")
+    if stats["segundos"]:
+        print(f"  Tempo: {stats['segundos']:.1f}s ({enviados / stats['segundos']:.1f} produtos/s)")
+
+
+def main():
+    """Função principal."""
+    opcoes = {"concorrencia": CONCORRENCIA_PADRAO, "taxa": TAXA_PADRAO, "capacidade": CAPACIDADE_PADRAO,
+              "limite": 0, "sinteticos": 0}
+    conversores = {"concorrencia": int, "taxa": float, "capacidade": int, "limite": int, "sinteticos": int}
+    for arg in sys.argv[1:]:
+        if arg.startswith("--") and "=" in arg:
+            chave, valor = arg[2:].split("=", 1)
+            if chave in opcoes:
+                opcoes[chave] = conversores[chave](valor)
+    forcar = "--todos" in sys.argv
+    usar_stub = "--stub" in sys.argv
+
+    print("=" * 60)
+    print("Publicador Nuvemshop")
+    print(f"Modo: {'TODOS' if forcar else 'SOMENTE ALTERADOS'}")
+    print(f"Concorrência: {opcoes['concorrencia']} | Taxa: {opcoes['taxa']}/s | Capacidade: {opcoes['capacidade']}")
+    print("=" * 60)
+
+    servidor = None
+    if usar_stub:
+        from stub_nuvemshop import iniciar_em_thread
+        servidor, estado_stub, url_base = iniciar_em_thread(taxa=opcoes["taxa"], capacidade=opcoes["capacidade"],
+                                                             falhas=0.02, latencia=0.02)
+        url_loja = f"{url_base}/1"
+        token = "stub"
+        print(f"\nStub local: {url_base}")
+    else:
+        if not NUVEMSHOP_STORE_ID or not NUVEMSHOP_ACCESS_TOKEN:
+            print("Erro: defina NUVEMSHOP_STORE_ID e NUVEMSHOP_ACCESS_TOKEN (ambiente ou import_precos.env)")
+            return
+        url_loja = f"{NUVEMSHOP_API_URL.rstrip('/')}/{NUVEMSHOP_STORE_ID}"
+        token = NUVEMSHOP_ACCESS_TOKEN
+
+    client = None
+    templates = None
+    pendentes = []
+    if opcoes["sinteticos"]:
+        from benchmark_conexao import gerar_documentos_sinteticos
+        from import_precos import converter_para_nuvemshop
+        print(f"\nGerando {opcoes['sinteticos']} produtos sintéticos...")
+        produtos = converter_para_nuvemshop(gerar_documentos_sinteticos(opcoes["sinteticos"]))
+    else:
+        print("\nCarregando produtos do MongoDB...")
+        _, client = conectar_mongodb()
+        db = client[DATABASE_NAME]
+        colecao = db[COLLECTION_NUVEMSHOP]
+        templates = carregar_templates_descricao(db)
+        cursor = colecao.find({})
+        if opcoes["limite"]:
+            cursor = cursor.limit(opcoes["limite"])
+        produtos = list(cursor)
+    print(f"  Produtos carregados: {len(produtos)}")
+
+    # Com o stub os ids e hashes são falsos: o resultado fica só em memória, sem gravar no
+    # MongoDB (senão a próxima publicação real pularia esses produtos como já publicados)
+    gravar_progresso = client is not None and not usar_stub
+    if client is not None and usar_stub:
+        print("  Stub: o progresso da publicação não é gravado no MongoDB")
+
+    async def ao_publicar(produto, dados):
+        if gravar_progresso:
+            pendentes.append(UpdateOne({"_id": produto["_id"]}, {"$set": {"nuvemshop": dados}}))
+            # Gravar o progresso em lotes (uma nova execução não reenvia o que já foi publicado).
+            # bulk_write é bloqueante: roda em thread para não parar as requisições em andamento
+            if len(pendentes) >= TAMANHO_LOTE_MONGO:
+                lote = pendentes[:]
+                pendentes.clear()
+                await asyncio.to_thread(colecao.bulk_write, lote, ordered=False)
+
+    print("\nPublicando...")
+    try:
+        stats = asyncio.run(publicar_produtos(
+            produtos, url_loja, token, templates,
+            concorrencia=opcoes["concorrencia"], taxa=opcoes["taxa"], capacidade=opcoes["capacidade"],
+            forcar=forcar, ao_publicar=ao_publicar,
+        ))
+        imprimir_stats(stats)
+    finally:
+        if pendentes:
+            colecao.bulk_write(pendentes, ordered=False)
+        if client is not None:
+            client.close()
+        if servidor is not None:
+            servidor.shutdown()
+            print(f"  Stub: {estado_stub.contadores}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,11 @@
 #   ./run.sh                    - Atualiza registros existentes (mantém IDs)
 #   ./run.sh clean              - Limpa a base antes de inserir
 #   ./run.sh debug=HAYABUSA     - Debug de um modelo específico (não salva no banco)
+#   ./run.sh derivados          - Gera derivados das imagens (1200px JPEG/WebP e miniatura)
+#   ./run.sh watch              - Fica observando planilha/imagens/estoque e reimporta alterações
+#   ./run.sh perfil=bulk        - Usa o perfil de conexão de carga em lote
+#   ./run.sh resume             - Retoma a última importação interrompida
+#   ./run.sh verify             - Confere no servidor ao final (contagens, exemplos, por marca)
 #   ./run.sh clean debug=MODELO - Combina opções
 
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
@@ -33,6 +38,24 @@ for arg in "$@"; do
         debug=*)
             ARGS="$ARGS --debug=${arg#debug=}"
             ;;
+        watch)
+            ARGS="$ARGS --watch"
+            ;;
+        derivados)
+            ARGS="$ARGS --derivados"
+            ;;
+        perfil=*)
+            ARGS="$ARGS --perfil=${arg#perfil=}"
+            ;;
+        resume)
+            ARGS="$ARGS --resume"
+            ;;
+        resume=*)
+            ARGS="$ARGS --resume=${arg#resume=}"
+            ;;
+        verify)
+            ARGS="$ARGS --verify"
+            ;;
     esac
 done
 
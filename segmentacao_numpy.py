@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Segmentação vetorizada das abas da planilha (NumPy), alternativa a processar_linhas_aba.
+
+Carrega as colunas A-G da aba inteira como arrays e calcula de uma vez as máscaras de
+linha separadora e de linha de marca (aba OUTRAS). Os limites dos blocos saem de somas
+acumuladas e as variantes são agrupadas pelo id do bloco. A saída é idêntica à do
+processamento linha a linha (mesmas regras de eh_linha_separadora e eh_linha_marca).
+
+Ativação: SEGMENTACAO=numpy (ambiente ou import_precos.env). Requer numpy.
+"""
+
+from datetime import datetime
+
+import numpy as np
+
+from import_precos import processar_ano_modelo
+
+COLUNAS = 7  # A-G: modelo, cor, kit/conjunto, elemento, preço, localização, referência
+
+
+def carregar_colunas(linhas):
+    """Converte as linhas (tuplas) nas 7 colunas A-G, como arrays de objetos (None se faltar)."""
+    linhas = list(linhas)
+    if linhas and min(len(linha) for linha in linhas) >= COLUNAS:
+        # Transposição em C: zip(*linhas) entrega uma tupla por coluna
+        return [np.fromiter(coluna, dtype=object, count=len(linhas))
+                for coluna in zip(*(linha[:COLUNAS] for linha in linhas))]
+
+    colunas = [np.full(len(linhas), None, dtype=object) for _ in range(COLUNAS)]
+    for i, linha in enumerate(linhas):
+        for j, valor in enumerate(linha[:COLUNAS]):
+            colunas[j][i] = valor
+    return colunas
+
+
+def _texto_em_branco(coluna):
+    """str(x).strip() == '' para cada valor da coluna."""
+    if hasattr(np, "strings"):
+        texto = coluna.astype(np.dtypes.StringDType())
+        return np.strings.str_len(np.strings.strip(texto)) == 0
+    return np.char.str_len(np.char.strip(coluna.astype(str))) == 0
+
+
+def falso(valores):
+    """Máscara de `not x` (None, 0, 0.0, False, '')."""
+    return np.equal(valores, None) | np.equal(valores, 0) | np.equal(valores, "")
+
+
+def vazio(coluna, linhas=None):
+    """Máscara de `not x or not str(x).strip()` nas linhas informadas (todas, se None)."""
+    valores = coluna if linhas is None else coluna[linhas]
+    mascara = falso(valores)
+    # strip só nos valores que ainda podem ser texto em branco
+    restantes = np.flatnonzero(~mascara)
+    mascara[restantes] = _texto_em_branco(valores[restantes])
+    return mascara
+
+
+def filtrar_vazias(colunas, linhas, indices):
+    """Mantém das linhas candidatas só as que têm vazias todas as colunas dos índices."""
+    for indice in indices:
+        linhas = linhas[vazio(colunas[indice], linhas)]
+    return linhas
+
+
+def processar_linhas_aba_numpy(marca_aba, linhas_aba, debug=False, debug_modelo=None):
+    """Mesmo contrato e saída de processar_linhas_aba, com a segmentação vetorizada."""
+    return processar_colunas_aba(marca_aba, carregar_colunas(linhas_aba), debug, debug_modelo)
+
+
+def segmentar_colunas(marca_aba, colunas):
+    """Separa a aba em blocos a partir das colunas A-G, sem percorrer as linhas.
+
+    Retorna dict com:
+        linhas: índices das linhas de dados (fora de separadoras e linhas de marca)
+        blocos: id do bloco de cada linha de dados (0, 1, 2... na ordem da aba)
+        marcas: marca de cada bloco
+        vazio_modelo, vazio_cor, falso_preco: máscaras por linha, reaproveitadas na montagem
+    """
+    n = len(colunas[0])
+
+    # Máscaras completas só das colunas usadas em todas as linhas (modelo, cor, preço);
+    # as demais são avaliadas apenas nas linhas candidatas a marca/separadora
+    vazio_modelo = vazio(colunas[0])
+    vazio_cor = vazio(colunas[1])
+    nulo_preco = np.equal(colunas[4], None)
+    zero_preco = np.equal(colunas[4], 0)
+    falso_preco = falso(colunas[4])
+
+    # Linhas de marca (só na aba OUTRAS): só a coluna A preenchida, sem números nem "GAV"
+    marca = np.zeros(n, dtype=bool)
+    if marca_aba == "OUTRAS":
+        candidatas = np.flatnonzero(~vazio_modelo & vazio_cor & falso_preco)
+        for i in filtrar_vazias(colunas, candidatas, (2, 3, 5, 6)):
+            texto = str(colunas[0][i]).strip().upper()
+            marca[i] = not any(c.isdigit() for c in texto) and "GAV" not in texto
+
+    # Linhas separadoras: tudo vazio exceto preço, que pode ser 0 (a linha de marca tem prioridade)
+    separadora = np.zeros(n, dtype=bool)
+    candidatas = np.flatnonzero(~marca & vazio_modelo & vazio_cor & (zero_preco | nulo_preco))
+    separadora[filtrar_vazias(colunas, candidatas, (2, 5, 6))] = True
+    dados = ~(marca | separadora)
+
+    # Blocos: cada sequência de linhas de dados; id do bloco pela soma acumulada dos inícios
+    inicio = dados & ~np.concatenate(([False], dados[:-1]))
+    bloco_id = np.cumsum(inicio) - 1
+    linhas_dados = np.flatnonzero(dados)
+
+    # Marca de cada bloco: última linha de marca antes do início do bloco (ou nome da aba)
+    ultima_marca = np.maximum.accumulate(np.where(marca, np.arange(n), -1))[np.flatnonzero(inicio)]
+    marcas = [
+        str(colunas[0][i]).strip().upper() if i >= 0 else marca_aba
+        for i in ultima_marca.tolist()
+    ]
+
+    return {
+        "linhas": linhas_dados,
+        "blocos": bloco_id[linhas_dados],
+        "marcas": marcas,
+        "vazio_modelo": vazio_modelo,
+        "vazio_cor": vazio_cor,
+        "falso_preco": falso_preco,
+    }
+
+
+def processar_colunas_aba(marca_aba, colunas, debug=False, debug_modelo=None):
+    """Processa uma aba já em colunas: lista com as 7 colunas A-G (arrays de objetos)."""
+    if len(colunas[0]) == 0:
+        return []
+    segmentacao = segmentar_colunas(marca_aba, colunas)
+    linhas_dados = segmentacao["linhas"]
+    blocos = segmentacao["blocos"]
+    marcas = segmentacao["marcas"]
+    total_blocos = len(marcas)
+    if not total_blocos:
+        return []
+
+    # Modelo de cada bloco: primeira célula não vazia da coluna A
+    com_modelo = ~segmentacao["vazio_modelo"][linhas_dados]
+    blocos_modelo, posicao = np.unique(blocos[com_modelo], return_index=True)
+    modelos = [None] * total_blocos
+    for b, i in zip(blocos_modelo.tolist(), linhas_dados[com_modelo][posicao].tolist()):
+        modelos[b] = str(colunas[0][i]).strip()
+
+    # Cores de cada bloco, sem repetir, na ordem em que aparecem
+    cores = [[] for _ in range(total_blocos)]
+    com_cor = ~segmentacao["vazio_cor"][linhas_dados]
+    for b, valor in zip(blocos[com_cor].tolist(), colunas[1][linhas_dados[com_cor]].tolist()):
+        cor_linha = str(valor).strip()
+        if cor_linha not in cores[b]:
+            cores[b].append(cor_linha)
+
+    # Variantes: linhas com kit/conjunto ou com preço diferente de zero
+    eh_variante = ~falso(colunas[2][linhas_dados]) | ~segmentacao["falso_preco"][linhas_dados]
+    linhas_variantes = linhas_dados[eh_variante]
+    variantes = [[] for _ in range(total_blocos)]
+    colunas_variantes = [colunas[i][linhas_variantes].tolist() for i in range(2, COLUNAS)]
+    for b, kit, elem, preco, loc, ref in zip(blocos[eh_variante].tolist(), *colunas_variantes):
+        variantes[b].append({
+            "peca": str(kit).strip() if kit else None,
+            "elemento": str(elem).strip() if elem else None,
+            "preco": float(preco) if preco and isinstance(preco, (int, float)) else 0.0,
+            "localizacao": str(loc).strip() if loc else None,
+            "referencia": str(ref).strip() if ref else None,
+        })
+
+    documentos = []
+    for b in range(total_blocos):
+        cor = " ".join(cores[b]) if cores[b] else None
+        modelo, ano, modelo_antigo = processar_ano_modelo(modelos[b])
+
+        if debug and modelo and (not debug_modelo or debug_modelo.upper() in modelo.upper()):
+            linhas_bloco = [[coluna[i] for coluna in colunas] for i in linhas_dados[blocos == b]]
+            print(f"\n[DEBUG] Bloco encontrado: {marcas[b]} - {modelo}")
+            print(f"[DEBUG] Cores encontradas: {cores[b]}")
+            print(f"[DEBUG] Cor final: {cor}")
+            print("[DEBUG] Linhas do bloco:")
+            for i, linha in enumerate(linhas_bloco):
+                print(f"  [{i}] col0={repr(linha[0])} | col1={repr(linha[1])} | col2={repr(linha[2])}")
+
+        if variantes[b]:
+            documentos.append({
+                "marca": marcas[b],
+                "modelo": modelo,
+                "modelo_antigo": modelo_antigo,  # Para busca de compatibilidade no upsert
+                "cor": cor,
+                "ano": ano,
+                "variantes": variantes[b],
+                "data_importacao": datetime.now()
+            })
+
+    return documentos
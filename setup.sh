@@ -25,7 +25,8 @@ echo ""
 echo "[2/3] Instalando dependências..."
 source venv/bin/activate
 pip install -q -r requirements.txt
-echo "Dependências instaladas: openpyxl, pymongo"
+echo "Dependências instaladas: openpyxl, pymongo (com zstd), Pillow, aiohttp, pyarrow"
+echo "Opcional: pip install numpy (SEGMENTACAO=numpy e códigos de estoque compactos)"
 
 # Subir MongoDB
 echo ""
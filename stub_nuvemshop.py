@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Servidor HTTP local que imita os endpoints de produtos da API Nuvemshop.
+
+Serve para testar o publicador offline: aplica um leaky bucket com os mesmos cabeçalhos
+de rate limit da API (x-rate-limit-limit / -remaining / -reset), responde 429 quando o
+balde enche e pode injetar falhas 5xx e latência.
+
+Endpoints:
+    GET  /{loja}/products?handle=...
+    GET  /{loja}/products/{id}
+    POST /{loja}/products
+    PUT  /{loja}/products/{id}
+
+Uso:
+    python stub_nuvemshop.py --porta=8099 --taxa=2 --capacidade=40 --falhas=0.02 --latencia=0.05
+"""
+
+import json
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class LeakyBucket:
+    """Balde que vaza `taxa` requisições por segundo e comporta até `capacidade`."""
+
+    def __init__(self, taxa, capacidade):
+        self.taxa = taxa
+        self.capacidade = capacidade
+        self.nivel = 0.0
+        self.ultimo = time.monotonic()
+        self._lock = threading.Lock()
+
+    def registrar(self):
+        """Registra uma requisição. Retorna (aceita, restante, reset_ms)."""
+        with self._lock:
+            agora = time.monotonic()
+            self.nivel = max(0.0, self.nivel - (agora - self.ultimo) * self.taxa)
+            self.ultimo = agora
+            aceita = self.nivel + 1 <= self.capacidade
+            if aceita:
+                self.nivel += 1
+            restante = int(self.capacidade - self.nivel)
+            reset_ms = int(self.nivel / self.taxa * 1000)
+            return aceita, restante, reset_ms
+
+
+class EstadoStub:
+    """Estado em memória do stub: produtos por id e contadores de requisições."""
+
+    def __init__(self, taxa=2.0, capacidade=40, falhas=0.0, latencia=0.0):
+        self.balde = LeakyBucket(taxa, capacidade)
+        self.falhas = falhas
+        self.latencia = latencia
+        self.produtos = {}
+        self.proximo_id = 1
+        self.contadores = {"requisicoes": 0, "429": 0, "5xx": 0, "criados": 0, "atualizados": 0}
+        self.lock = threading.Lock()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Handler dos endpoints de produtos."""
+
+    protocol_version = "HTTP/1.1"
+    estado = None  # EstadoStub, definido em criar_servidor
+
+    def log_message(self, formato, *args):
+        pass  # Silencioso; use os contadores do estado
+
+    def _responder(self, status, corpo=None, cabecalhos=None):
+        dados = json.dumps(corpo).encode() if corpo is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(dados)))
+        for chave, valor in (cabecalhos or {}).items():
+            self.send_header(chave, str(valor))
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def _ler_json(self):
+        tamanho = int(self.headers.get("Content-Length") or 0)
+        if not tamanho:
+            return {}
+        return json.loads(self.rfile.read(tamanho))
+
+    def _tratar(self, metodo):
+        estado = self.estado
+        # Consumir o corpo antes de qualquer resposta (mantém a conexão keep-alive válida)
+        corpo = self._ler_json() if metodo in ("POST", "PUT") else None
+
+        with estado.lock:
+            estado.contadores["requisicoes"] += 1
+
+        if not self.headers.get("Authentication"):
+            self._responder(401, {"code": 401, "message": "Unauthorized"})
+            return
+
+        aceita, restante, reset_ms = estado.balde.registrar()
+        cabecalhos = {
+            "x-rate-limit-limit": estado.balde.capacidade,
+            "x-rate-limit-remaining": restante,
+            "x-rate-limit-reset": reset_ms,
+        }
+        if not aceita:
+            with estado.lock:
+                estado.contadores["429"] += 1
+            self._responder(429, {"code": 429, "message": "Too Many Requests"}, cabecalhos)
+            return
+
+        if estado.latencia:
+            time.sleep(estado.latencia)
+
+        if estado.falhas and random.random() < estado.falhas:
+            with estado.lock:
+                estado.contadores["5xx"] += 1
+            self._responder(503, {"code": 503, "message": "Service Unavailable"}, cabecalhos)
+            return
+
+        url = urlparse(self.path)
+        m = re.match(r"^/[^/]+/products(?:/(\d+))?/?$", url.path)
+        if not m:
+            self._responder(404, {"code": 404, "message": "Not Found"}, cabecalhos)
+            return
+        produto_id = int(m.group(1)) if m.group(1) else None
+
+        with estado.lock:
+            if metodo == "GET" and produto_id is None:
+                handle = parse_qs(url.query).get("handle", [None])[0]
+                encontrados = [
+                    p for p in estado.produtos.values()
+                    if handle is None or p.get("handle", {}).get("pt") == handle
+                ]
+                self._responder(200, encontrados, cabecalhos)
+            elif metodo == "GET":
+                if produto_id not in estado.produtos:
+                    self._responder(404, {"code": 404, "message": "Not Found"}, cabecalhos)
+                else:
+                    self._responder(200, estado.produtos[produto_id], cabecalhos)
+            elif metodo == "POST" and produto_id is None:
+                produto = dict(corpo, id=estado.proximo_id)
+                estado.produtos[estado.proximo_id] = produto
+                estado.proximo_id += 1
+                estado.contadores["criados"] += 1
+                self._responder(201, produto, cabecalhos)
+            elif metodo == "PUT" and produto_id is not None:
+                if produto_id not in estado.produtos:
+                    self._responder(404, {"code": 404, "message": "Not Found"}, cabecalhos)
+                else:
+                    estado.produtos[produto_id].update(corpo)
+                    estado.contadores["atualizados"] += 1
+                    self._responder(200, estado.produtos[produto_id], cabecalhos)
+            else:
+                self._responder(405, {"code": 405, "message": "Method Not Allowed"}, cabecalhos)
+
+    def do_GET(self):
+        self._tratar("GET")
+
+    def do_POST(self):
+        self._tratar("POST")
+
+    def do_PUT(self):
+        self._tratar("PUT")
+
+
+def criar_servidor(porta=0, taxa=2.0, capacidade=40, falhas=0.0, latencia=0.0):
+    """Cria o servidor stub (porta=0 escolhe uma porta livre).
+
+    Retorna (servidor, estado). Para rodar em segundo plano, use iniciar_em_thread.
+    """
+    estado = EstadoStub(taxa, capacidade, falhas, latencia)
+    handler = type("StubHandlerConfigurado", (StubHandler,), {"estado": estado})
+    servidor = ThreadingHTTPServer(("127.0.0.1", porta), handler)
+    servidor.daemon_threads = True
+    return servidor, estado
+
+
+def iniciar_em_thread(**opcoes):
+    """Sobe o stub em uma thread daemon. Retorna (servidor, estado, url_base)."""
+    servidor, estado = criar_servidor(**opcoes)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    url_base = f"http://127.0.0.1:{servidor.server_address[1]}"
+    return servidor, estado, url_base
+
+
+def main():
+    """Função principal."""
+    opcoes = {"porta": 8099, "taxa": 2.0, "capacidade": 40, "falhas": 0.0, "latencia": 0.0}
+    conversores = {"porta": int, "taxa": float, "capacidade": int, "falhas": float, "latencia": float}
+    for arg in sys.argv[1:]:
+        if arg.startswith("--") and "=" in arg:
+            chave, valor = arg[2:].split("=", 1)
+            if chave in opcoes:
+                opcoes[chave] = conversores[chave](valor)
+
+    servidor, estado = criar_servidor(**opcoes)
+    print(f"Stub Nuvemshop em http://127.0.0.1:{servidor.server_address[1]} "
+          f"(taxa={opcoes['taxa']}/s, capacidade={opcoes['capacidade']}, "
+          f"falhas={opcoes['falhas']:.0%}, latência={opcoes['latencia']}s)")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+        print(f"\nContadores: {estado.contadores}")
+
+
+if __name__ == "__main__":
+    main()
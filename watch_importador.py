@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+Modo watch do importador: reimporta só o que mudou na planilha, nas imagens ou no estoque.
+
+Observa EXCEL_PATH, IMAGES_PATH e CODIGOS_ESTOQUE_PATH (inotify via watchdog, ou polling
+se o watchdog não estiver instalado), agrupa rajadas de gravações (debounce) e, a cada
+ciclo, reprocessa apenas:
+- as abas cujo hash das linhas mudou;
+- os produtos das marcas cujas pastas de imagens mudaram;
+- os produtos com SKUs que entraram ou saíram do arquivo de estoque.
+Só documentos cujo conteúdo mudou são gravados; modelos/cores que saíram da planilha e os
+produtos que deixaram de existir são removidos do MongoDB. A conexão MongoDB, o índice de imagens,
+os códigos de estoque e os documentos de cada aba ficam em memória entre os ciclos.
+
+Uso:
+    python import_precos.py --watch
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+from openpyxl import load_workbook
+from pymongo import DeleteOne
+
+from import_precos import (
+    CODIGOS_ESTOQUE_PATH,
+    COLLECTION_IMAGENS,
+    COLLECTION_NAME,
+    COLLECTION_NUVEMSHOP,
+    DERIVADOS_PATH,
+    EXCEL_PATH,
+    IMAGE_HASH_CACHE_PATH,
+    IMAGES_PATH,
+    calcular_hashes_imagens,
+    carregar_codigos_estoque,
+    config,
+    consolidar_documentos,
+    converter_para_nuvemshop,
+    gravar_precos,
+    gravar_produtos_nuvemshop,
+    indexar_imagens,
+    normalizar_texto,
+    obter_colecao_bulk,
+    salvar_imagens_compartilhadas,
+    salvar_template_descricao,
+    segmentar_aba,
+)
+
+WATCH_INTERVALO = float(config("WATCH_INTERVALO", "5"))   # segundos entre verificações (polling)
+WATCH_DEBOUNCE = float(config("WATCH_DEBOUNCE", "3"))     # segundos sem eventos antes de processar
+
+EXTENSOES_IMAGEM = ('.jpg', '.jpeg', '.png')
+# Campos que mudam a cada gravação e não fazem parte do conteúdo
+CAMPOS_VOLATEIS = {"_id", "data_importacao", "created_at", "updated_at", "nuvemshop"}
+
+
+def snapshot_arquivo(caminho):
+    """Retorna (tamanho, mtime_ns) do arquivo, ou None se não existir."""
+    try:
+        st = os.stat(caminho)
+    except OSError:
+        return None
+    return (st.st_size, st.st_mtime_ns)
+
+
+def snapshot_imagens(caminho_base):
+    """Retorna {pasta_relativa: ((arquivo, tamanho, mtime_ns), ...)} das pastas com imagens."""
+    snapshot = {}
+    if not os.path.isdir(caminho_base):
+        return snapshot
+    for raiz, _, arquivos in os.walk(caminho_base):
+        entradas = []
+        for arquivo in arquivos:
+            if arquivo.lower().endswith(EXTENSOES_IMAGEM):
+                try:
+                    st = os.stat(os.path.join(raiz, arquivo))
+                except OSError:
+                    continue
+                entradas.append((arquivo, st.st_size, st.st_mtime_ns))
+        if entradas:
+            snapshot[os.path.relpath(raiz, caminho_base)] = tuple(sorted(entradas))
+    return snapshot
+
+
+def marcas_alteradas(antes, depois):
+    """Compara dois snapshots de imagens e retorna as marcas (normalizadas) afetadas."""
+    pastas = {p for p in set(antes) | set(depois) if antes.get(p) != depois.get(p)}
+    return {normalizar_texto(p.split(os.sep)[0]) for p in pastas}
+
+
+def hash_linhas(linhas):
+    """Hash das linhas de uma aba (detecta abas alteradas)."""
+    h = hashlib.blake2b(digest_size=16)
+    for linha in linhas:
+        h.update(repr(linha).encode())
+        h.update(b"\n")
+    return h.hexdigest()
+
+
+def impressao_digital(doc):
+    """Hash do conteúdo do documento, ignorando campos voláteis (datas, _id)."""
+    conteudo = {k: v for k, v in doc.items() if k not in CAMPOS_VOLATEIS}
+    return hashlib.blake2b(
+        json.dumps(conteudo, sort_keys=True, default=str).encode(), digest_size=16
+    ).hexdigest()
+
+
+class EstadoWatch:
+    """Estado mantido em memória entre os ciclos."""
+
+    def __init__(self):
+        self.snap_excel = None
+        self.snap_estoque = None
+        self.snap_imagens = None
+        self.abas = {}                 # nome -> {'hash': str, 'documentos': [...]}
+        self.documentos = []           # documentos consolidados (coleção precos)
+        self.digitais_precos = {}      # (marca, modelo, cor) -> hash
+        self.indice_imagens = {}
+        self.erros_hashes = 0          # erros no último cálculo dos hashes das imagens
+        self.codigos_estoque = set()
+        self.produtos = {}             # handle -> produto Nuvemshop
+        self.digitais_produtos = {}    # handle -> hash
+
+
+def ler_abas_alteradas(estado):
+    """Lê a planilha e reprocessa só as abas cujo hash das linhas mudou.
+
+    Retorna dict {nome: {'hash', 'documentos'}} com todas as abas atuais.
+    """
+    wb = load_workbook(EXCEL_PATH, data_only=True, read_only=True)
+    abas = {}
+    for sheet_name in wb.sheetnames:
+        ws = wb[sheet_name]
+        linhas = list(ws.iter_rows(min_row=2, max_col=7, values_only=True))
+        hash_aba = hash_linhas(linhas)
+        anterior = estado.abas.get(sheet_name)
+        if anterior and anterior["hash"] == hash_aba:
+            abas[sheet_name] = anterior
+            continue
+        print(f"  Aba alterada: {sheet_name.upper()} ({len(linhas)} linhas)")
+        abas[sheet_name] = {
+            "hash": hash_aba,
+            "documentos": segmentar_aba(sheet_name.upper(), linhas),
+        }
+    wb.close()
+    return abas
+
+
+def executar_ciclo(estado, db, perfil, derivados=False):
+    """Detecta o que mudou desde o último ciclo e grava só os documentos afetados.
+
+    Com derivados=True, gera os derivados das imagens dos produtos alterados antes de gravar.
+    O estado só é atualizado depois das gravações: se algo falhar, o próximo ciclo
+    tenta de novo as mesmas mudanças. Retorna True se houve alguma mudança.
+    """
+    snap_excel = snapshot_arquivo(EXCEL_PATH)
+    snap_estoque = snapshot_arquivo(CODIGOS_ESTOQUE_PATH)
+    snap_imagens = snapshot_imagens(IMAGES_PATH)
+
+    mudou_excel = snap_excel != estado.snap_excel
+    mudou_estoque = snap_estoque != estado.snap_estoque
+    mudou_imagens = snap_imagens != estado.snap_imagens
+    if not (mudou_excel or mudou_estoque or mudou_imagens):
+        return False
+
+    inicio = time.perf_counter()
+    print("\n" + "=" * 60)
+    print(f"Ciclo de importação: {time.strftime('%H:%M:%S')}")
+    print("=" * 60)
+
+    # Planilha: reprocessar só as abas alteradas e reconsolidar
+    abas = estado.abas
+    documentos = estado.documentos
+    if mudou_excel:
+        print(f"\nPlanilha alterada: {EXCEL_PATH}")
+        abas = ler_abas_alteradas(estado)
+        documentos = consolidar_documentos([d for aba in abas.values() for d in aba["documentos"]])
+
+    digitais_precos = {
+        (d["marca"], d["modelo"], d["cor"]): impressao_digital(d) for d in documentos
+    }
+    chaves_alteradas = {
+        chave for chave, digital in digitais_precos.items()
+        if estado.digitais_precos.get(chave) != digital
+    }
+    # Modelos/cores que saíram da planilha: a marca inteira é reconvertida (abaixo)
+    chaves_removidas = set(estado.digitais_precos) - set(digitais_precos)
+
+    # Imagens: reindexar (hashes de conteúdo vêm do cache) e identificar marcas afetadas
+    indice_imagens = estado.indice_imagens
+    marcas = set()
+    if mudou_imagens:
+        marcas = marcas_alteradas(estado.snap_imagens or {}, snap_imagens)
+        print(f"\nImagens alteradas nas marcas: {', '.join(sorted(marcas))}")
+        indice_imagens = indexar_imagens(IMAGES_PATH)
+        stats_hashes = calcular_hashes_imagens(indice_imagens, IMAGES_PATH, IMAGE_HASH_CACHE_PATH)
+        estado.erros_hashes = stats_hashes["erros"]
+    marcas |= {normalizar_texto(marca) for marca, _, _ in chaves_removidas}
+
+    # Estoque: SKUs que entraram ou saíram da lista
+    codigos_estoque = estado.codigos_estoque
+    skus_alterados = set()
+    if mudou_estoque:
+        codigos_estoque = carregar_codigos_estoque(CODIGOS_ESTOQUE_PATH)
+        skus_alterados = codigos_estoque ^ estado.codigos_estoque
+        print(f"\nEstoque alterado: {len(skus_alterados)} SKUs entraram/saíram")
+
+    # Documentos cujos produtos Nuvemshop precisam ser reconvertidos
+    afetados = []
+    for doc in documentos:
+        if (
+            (doc["marca"], doc["modelo"], doc["cor"]) in chaves_alteradas
+            or normalizar_texto(doc["marca"]) in marcas
+            or any(var.get("referencia") in skus_alterados for var in doc["variantes"])
+        ):
+            afetados.append(doc)
+
+    precos_alterados = [d for d in documentos if (d["marca"], d["modelo"], d["cor"]) in chaves_alteradas]
+    print(f"\nDocumentos alterados (precos): {len(precos_alterados)}")
+    print(f"Produtos a reconverter: {len(afetados)}")
+
+    # Marcas reconvertidas por inteiro (imagens alteradas ou modelos/cores removidos): seus
+    # produtos saem do estado antes de sobrepor os regenerados, para os handles que deixaram
+    # de existir não ficarem para trás
+    produtos = {
+        handle: produto for handle, produto in estado.produtos.items()
+        if normalizar_texto(produto.get("marca")) not in marcas
+    }
+    digitais_produtos = {handle: estado.digitais_produtos[handle] for handle in produtos}
+    produtos_alterados = []
+    if afetados:
+        for produto in converter_para_nuvemshop(afetados, indice_imagens, codigos_estoque):
+            digital = impressao_digital(produto)
+            produtos[produto["handle"]] = produto
+            digitais_produtos[produto["handle"]] = digital
+            if estado.digitais_produtos.get(produto["handle"]) != digital:
+                produtos_alterados.append(produto)
+    handles_removidos = sorted(set(estado.produtos) - set(produtos))
+
+    # Gravar só o que mudou (sempre em modo UPSERT)
+    if precos_alterados:
+        gravar_precos(obter_colecao_bulk(db, COLLECTION_NAME, perfil), precos_alterados)
+    if chaves_removidas:
+        print(f"\nDocumentos removidos (precos): {len(chaves_removidas)}")
+        obter_colecao_bulk(db, COLLECTION_NAME, perfil).bulk_write([
+            DeleteOne({"marca": marca, "modelo": modelo, "cor": cor})
+            for marca, modelo, cor in sorted(chaves_removidas, key=repr)
+        ], ordered=False)
+    if produtos_alterados and derivados:
+        from derivados_imagens import gerar_derivados
+        stats_derivados = gerar_derivados(produtos_alterados, IMAGES_PATH, DERIVADOS_PATH)
+        print(f"\nDerivados das imagens: {stats_derivados['total']} (cache: {stats_derivados['cache']}, "
+              f"geradas: {stats_derivados['gerados']}, erros: {stats_derivados['erros']})")
+    if produtos_alterados:
+        print(f"\nProdutos Nuvemshop alterados: {len(produtos_alterados)}")
+        gravar_produtos_nuvemshop(obter_colecao_bulk(db, COLLECTION_NUVEMSHOP, perfil), produtos_alterados)
+    if handles_removidos:
+        print(f"\nProdutos Nuvemshop removidos: {len(handles_removidos)}")
+        obter_colecao_bulk(db, COLLECTION_NUVEMSHOP, perfil).delete_many({"handle": {"$in": handles_removidos}})
+    if produtos_alterados or handles_removidos or mudou_imagens:
+        salvar_imagens_compartilhadas(
+            obter_colecao_bulk(db, COLLECTION_IMAGENS, perfil), list(produtos.values()),
+            remover_orfas=not estado.erros_hashes,
+        )
+
+    # Gravações concluídas: atualizar o estado
+    estado.snap_excel = snap_excel
+    estado.snap_estoque = snap_estoque
+    estado.snap_imagens = snap_imagens
+    estado.abas = abas
+    estado.documentos = documentos
+    estado.digitais_precos = digitais_precos
+    estado.indice_imagens = indice_imagens
+    estado.codigos_estoque = codigos_estoque
+    estado.produtos = produtos
+    estado.digitais_produtos = digitais_produtos
+
+    print(f"\nCiclo concluído em {time.perf_counter() - inicio:.1f}s")
+    return True
+
+
+def criar_observador(evento):
+    """Cria um observador inotify (watchdog) que sinaliza `evento`. Retorna None sem watchdog."""
+    try:
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+    except ImportError:
+        return None
+
+    arquivos = {os.path.abspath(EXCEL_PATH), os.path.abspath(CODIGOS_ESTOQUE_PATH)}
+    pasta_imagens = os.path.abspath(IMAGES_PATH)
+
+    class Handler(FileSystemEventHandler):
+        def on_any_event(self, event):
+            caminhos = [event.src_path, getattr(event, "dest_path", "")]
+            for caminho in caminhos:
+                caminho = os.path.abspath(caminho) if caminho else ""
+                if caminho in arquivos or caminho.startswith(pasta_imagens):
+                    evento.set()
+                    return
+
+    observador = Observer()
+    handler = Handler()
+    # Pastas dos arquivos (editores gravam via arquivo temporário + rename)
+    for pasta in {os.path.dirname(a) for a in arquivos}:
+        if os.path.isdir(pasta):
+            observador.schedule(handler, pasta, recursive=False)
+    if os.path.isdir(pasta_imagens):
+        observador.schedule(handler, pasta_imagens, recursive=True)
+    return observador
+
+
+def executar_watch(db, perfil, derivados=False):
+    """Loop principal do modo watch (Ctrl+C para sair). derivados: ver executar_ciclo."""
+    print("\nModo watch: observando alterações")
+    print(f"  Planilha: {EXCEL_PATH}")
+    print(f"  Imagens: {IMAGES_PATH}")
+    print(f"  Estoque: {CODIGOS_ESTOQUE_PATH}")
+    if derivados:
+        print(f"  Derivados: {DERIVADOS_PATH}")
+
+    salvar_template_descricao(db)
+    estado = EstadoWatch()
+
+    evento = threading.Event()
+    observador = criar_observador(evento)
+    if observador:
+        observador.start()
+        print(f"  Observador: inotify (debounce {WATCH_DEBOUNCE}s)")
+    else:
+        print(f"  Observador: polling a cada {WATCH_INTERVALO}s (instale watchdog para inotify)")
+
+    try:
+        primeiro_ciclo = True  # Importação completa (estado vazio)
+        while True:
+            if primeiro_ciclo:
+                primeiro_ciclo = False
+            elif observador:
+                evento.wait()
+                # Debounce: esperar a rajada de eventos terminar
+                evento.clear()
+                while evento.wait(WATCH_DEBOUNCE):
+                    evento.clear()
+            else:
+                time.sleep(WATCH_INTERVALO)
+                if (
+                    snapshot_arquivo(EXCEL_PATH) == estado.snap_excel
+                    and snapshot_arquivo(CODIGOS_ESTOQUE_PATH) == estado.snap_estoque
+                    and snapshot_imagens(IMAGES_PATH) == estado.snap_imagens
+                ):
+                    continue
+                # Debounce: esperar os arquivos pararem de mudar
+                anterior = None
+                while True:
+                    atual = (snapshot_arquivo(EXCEL_PATH), snapshot_arquivo(CODIGOS_ESTOQUE_PATH),
+                             snapshot_imagens(IMAGES_PATH))
+                    if atual == anterior:
+                        break
+                    anterior = atual
+                    time.sleep(WATCH_DEBOUNCE)
+            try:
+                executar_ciclo(estado, db, perfil, derivados)
+            except Exception as e:
+                print(f"Erro no ciclo de importação (nova tentativa na próxima alteração): {e}")
+    except KeyboardInterrupt:
+        print("\nModo watch encerrado.")
+    finally:
+        if observador:
+            observador.stop()
+            observador.join()